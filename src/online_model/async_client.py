@@ -0,0 +1,278 @@
+import asyncio
+import logging
+from typing import Dict, Any, List, Optional
+
+import aiohttp
+
+from online_model.client import _dumps, _loads
+
+# Kept apart from online_model.client so the synchronous run loop does not import
+# aiohttp, which is an optional dependency
+
+logger = logging.getLogger(__name__)
+
+
+class AsyncInferenceClient:
+    """Asynchronous client for calling the inference service.
+    Coalesces concurrent single-sample predictions into ``/predict/batch`` requests.
+
+    Each call to ``predict_async`` is queued; a background task drains up to
+    ``max_batch_size`` queued inputs, or whatever has arrived after ``max_wait_ms``,
+    sends them as one batch request and resolves each caller with its own result.
+    Up to ``pool_maxsize`` batch requests are in flight at once.
+    The remaining methods mirror ``InferenceClient`` as coroutines. Use as an async
+    context manager, or call ``close()`` when done::
+
+        async with AsyncInferenceClient(url) as client:
+            results = await asyncio.gather(*[client.predict_async(x) for x in xs])
+
+    Parameters
+    ----------
+    base_url : str
+        Base URL of the inference service (e.g., "http://inference-service:8000").
+    timeout : int, optional
+        Request timeout in seconds. Default is 30.
+    pool_maxsize : int, optional
+        Maximum number of simultaneous connections. Default is 64.
+    max_batch_size : int, optional
+        Maximum number of inputs coalesced into one batch request. Default is 32.
+    max_wait_ms : float, optional
+        Maximum time in milliseconds to wait for a batch to fill. Default is 5.
+    """
+
+    def __init__(
+        self,
+        base_url: str,
+        timeout: int = 30,
+        pool_maxsize: int = 64,
+        max_batch_size: int = 32,
+        max_wait_ms: float = 5.0
+    ):
+        self.base_url = base_url.rstrip('/')
+        self.timeout = timeout
+        self.pool_maxsize = pool_maxsize
+        self.max_batch_size = max_batch_size
+        self.max_wait_ms = max_wait_ms
+
+        self._health_url = f"{self.base_url}/health"
+        self._model_info_url = f"{self.base_url}/model/info"
+        self._inputs_url = f"{self.base_url}/inputs"
+        self._outputs_url = f"{self.base_url}/outputs"
+        self._predict_url = f"{self.base_url}/predict"
+        self._batch_url = f"{self.base_url}/predict/batch"
+
+        # Session, queue and batching task are bound to the running event loop,
+        # so they are created on first use rather than here
+        self.session: Optional[aiohttp.ClientSession] = None
+        self._queue: Optional[asyncio.Queue] = None
+        self._batcher: Optional[asyncio.Task] = None
+        self._dispatches: set = set()
+
+        logger.info(f"Initialized async client for {self.base_url} with request batching")
+
+    def _ensure_started(self):
+        """Create the HTTP session and start the batching task if needed"""
+        if self.session is None or self.session.closed:
+            self.session = aiohttp.ClientSession(
+                connector=aiohttp.TCPConnector(limit=self.pool_maxsize, keepalive_timeout=75),
+                headers={'Content-Type': 'application/json'}
+            )
+        if self._batcher is None or self._batcher.done():
+            self._queue = asyncio.Queue()
+            self._batcher = asyncio.create_task(self._batch_loop())
+
+    async def __aenter__(self):
+        self._ensure_started()
+        return self
+
+    async def __aexit__(self, exc_type, exc_value, traceback):
+        await self.close()
+
+    async def close(self):
+        """Stop the batching task, fail any queued predictions and close the HTTP session"""
+        if self._batcher is not None:
+            self._batcher.cancel()
+            # gather returns the batcher's CancelledError, but still raises if close()
+            # itself is cancelled
+            await asyncio.gather(self._batcher, return_exceptions=True)
+            self._batcher = None
+        # Batch requests still in flight fail their callers when cancelled
+        for task in list(self._dispatches):
+            task.cancel()
+        await asyncio.gather(*self._dispatches, return_exceptions=True)
+        if self._queue is not None:
+            # Callers still waiting in the queue would otherwise never be resolved
+            while not self._queue.empty():
+                _, future = self._queue.get_nowait()
+                if not future.done():
+                    future.set_exception(ConnectionError("client closed"))
+        if self.session is not None:
+            await self.session.close()
+            self.session = None
+
+    async def _get(self, url: str, timeout: float) -> Dict[str, Any]:
+        self._ensure_started()
+        async with self.session.get(
+            url,
+            timeout=aiohttp.ClientTimeout(total=timeout)
+        ) as response:
+            response.raise_for_status()
+            return _loads(await response.read())
+
+    async def health_check(self) -> bool:
+        """
+        Check if the inference service is healthy.
+
+        Returns
+        -------
+        bool
+            True if the service responds with status 200, False otherwise.
+        """
+        self._ensure_started()
+        try:
+            async with self.session.get(
+                self._health_url,
+                timeout=aiohttp.ClientTimeout(total=5)
+            ) as response:
+                return response.status == 200
+        except Exception as e:
+            logger.error(f"Health check failed: {e}")
+            return False
+
+    async def get_model_info(self) -> Dict[str, Any]:
+        """Get model metadata"""
+        return await self._get(self._model_info_url, self.timeout)
+
+    async def get_inputs(self) -> Dict[str, Any]:
+        """Get model input specifications"""
+        return await self._get(self._inputs_url, self.timeout)
+
+    async def get_outputs(self) -> Dict[str, Any]:
+        """Get model output specifications"""
+        return await self._get(self._outputs_url, self.timeout)
+
+    async def predict(self, inputs: Dict[str, float]) -> Dict[str, Any]:
+        """
+        Make a single prediction without batching.
+
+        Parameters
+        ----------
+        inputs : Dict[str, float]
+            Dictionary of input features.
+
+        Returns
+        -------
+        Dict[str, Any]
+            Prediction response with outputs.
+        """
+        self._ensure_started()
+        async with self.session.post(
+            self._predict_url,
+            data=_dumps({"inputs": inputs}),
+            timeout=aiohttp.ClientTimeout(total=self.timeout)
+        ) as response:
+            response.raise_for_status()
+            return _loads(await response.read())
+
+    async def predict_batch(self, inputs_list: List[Dict[str, float]]) -> Dict[str, Any]:
+        """
+        Make batch predictions.
+
+        Parameters
+        ----------
+        inputs_list : List[Dict[str, float]]
+            List of input dictionaries (each can be partial).
+
+        Returns
+        -------
+        Dict[str, Any]
+            Batch prediction response with list of outputs.
+        """
+        self._ensure_started()
+        async with self.session.post(
+            self._batch_url,
+            data=_dumps({"inputs_list": inputs_list}),
+            timeout=aiohttp.ClientTimeout(total=self.timeout * 2)  # Longer timeout for batch
+        ) as response:
+            response.raise_for_status()
+            return _loads(await response.read())
+
+    async def predict_async(self, inputs: Dict[str, float]) -> Dict[str, Any]:
+        """
+        Make a prediction, batched together with other concurrent callers.
+
+        Parameters
+        ----------
+        inputs : Dict[str, float]
+            Dictionary of input features.
+
+        Returns
+        -------
+        Dict[str, Any]
+            Prediction response with outputs, in the same form as ``InferenceClient.predict``.
+        """
+        self._ensure_started()
+        future = asyncio.get_running_loop().create_future()
+        await self._queue.put((inputs, future))
+        return await future
+
+    async def _batch_loop(self):
+        """Drain the queue into batches and dispatch each one concurrently until cancelled"""
+        loop = asyncio.get_running_loop()
+        in_flight = asyncio.Semaphore(self.pool_maxsize)
+
+        def dispatch_done(task):
+            self._dispatches.discard(task)
+            in_flight.release()
+
+        while True:
+            batch = [await self._queue.get()]
+            try:
+                deadline = loop.time() + self.max_wait_ms / 1000
+                while len(batch) < self.max_batch_size:
+                    remaining = deadline - loop.time()
+                    if remaining <= 0:
+                        break
+                    # Unlike wait_for on Python 3.11, timeout() never swallows a
+                    # cancellation that arrives as the get completes
+                    try:
+                        async with asyncio.timeout(remaining):
+                            batch.append(await self._queue.get())
+                    except TimeoutError:
+                        break
+                # Wait for a free connection slot, then send without waiting for the reply
+                await in_flight.acquire()
+                task = asyncio.create_task(self._dispatch(batch))
+                self._dispatches.add(task)
+                task.add_done_callback(dispatch_done)
+            except asyncio.CancelledError:
+                # Inputs already taken off the queue are not reached by close()
+                for _, future in batch:
+                    if not future.done():
+                        future.set_exception(ConnectionError("client closed"))
+                raise
+
+    async def _dispatch(self, batch):
+        """Send one batch request and resolve each caller's future"""
+        try:
+            result = await self.predict_batch([inputs for inputs, _ in batch])
+            outputs_list = result["outputs_list"]
+            if len(outputs_list) != len(batch):
+                raise ValueError(
+                    f"Batch prediction returned {len(outputs_list)} outputs for {len(batch)} inputs"
+                )
+        except asyncio.CancelledError:
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(ConnectionError("client closed"))
+            raise
+        except Exception as e:
+            logger.error(f"Batch prediction of {len(batch)} inputs failed: {e}")
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(e)
+            return
+
+        for (_, future), outputs in zip(batch, outputs_list):
+            if not future.done():
+                future.set_result({"outputs": outputs})
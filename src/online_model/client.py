@@ -1,13 +1,125 @@
+import atexit
+import base64
+import copy
+import os
+import threading
+import time
 import requests
-from typing import Dict, Any, List, Optional
+from typing import Dict, Any, List, Optional, Sequence, Tuple
 import logging
+import numpy as np
 from requests.adapters import HTTPAdapter
 from urllib3.util.retry import Retry
 
-logging.basicConfig(level=logging.INFO)
+def _numpy_default(obj):
+    """Convert numpy values that the serializer cannot handle natively"""
+    if isinstance(obj, np.generic):
+        return obj.item()
+    if isinstance(obj, np.ndarray):
+        return obj.tolist()
+    raise TypeError(f"Cannot serialize object of type {type(obj)}")
+
+
+try:
+    import orjson
+
+    def _dumps(obj) -> bytes:
+        # numpy arrays and scalars are written directly from their buffers
+        return orjson.dumps(obj, default=_numpy_default, option=orjson.OPT_SERIALIZE_NUMPY)
+
+    _loads = orjson.loads
+except ImportError:
+    import json
+
+    def _dumps(obj) -> bytes:
+        return json.dumps(obj, default=_numpy_default).encode()
+
+    _loads = json.loads
+
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+
+_MSGPACK_TYPE = "application/msgpack"
+_MSGPACK_HEADERS = {"Content-Type": _MSGPACK_TYPE, "Accept": f"{_MSGPACK_TYPE}, application/json"}
+
+logging.basicConfig(level=os.environ.get("LOG_LEVEL", "INFO").upper())
 logger = logging.getLogger(__name__)
 
 
+# Pooled sessions shared by all InferenceClient instances, keyed by base URL and pool settings
+_SESSION_REGISTRY: Dict[Tuple, requests.Session] = {}
+_SESSION_LOCK = threading.Lock()
+
+
+def _build_session(max_retries: int, pool_connections: int, pool_maxsize: int, pool_block: bool) -> requests.Session:
+    """Create a requests session with retries and connection pooling"""
+    # Create session with connection pooling
+    session = requests.Session()
+    
+    # Configure retry strategy. Only idempotent methods are retried on read
+    # errors and error statuses, so a prediction the server may already have
+    # processed is never re-run. Connection errors happen before the request
+    # reaches the server and are retried for every method, POST included.
+    retry_strategy = Retry(
+        total=max_retries,
+        backoff_factor=0.5,  # Wait 0.5s, 1s, 2s between retries
+        status_forcelist=[429, 500, 502, 503, 504],
+        allowed_methods=["HEAD", "GET", "OPTIONS"]
+    )
+    
+    # Configure HTTP adapter with connection pooling
+    adapter = HTTPAdapter(
+        max_retries=retry_strategy,
+        pool_connections=pool_connections,
+        pool_maxsize=pool_maxsize,
+        pool_block=pool_block
+    )
+    
+    # Mount adapter for both http and https
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    
+    # Set default headers (avoid connection close)
+    session.headers.update({
+        'Connection': 'keep-alive',
+        'Content-Type': 'application/json'
+    })
+    return session
+
+
+def close_all_sessions():
+    """Close every shared session; registered to run at interpreter exit"""
+    with _SESSION_LOCK:
+        for session in _SESSION_REGISTRY.values():
+            session.close()
+        _SESSION_REGISTRY.clear()
+
+
+atexit.register(close_all_sessions)
+
+
+def _encode_columnar(
+    names: Sequence[str], values: np.ndarray, names_key: str, dtype=np.float32
+) -> Dict[str, Any]:
+    """Pack a 2-D (samples x variables) array as base64-encoded float32 or float64 bytes"""
+    values = np.ascontiguousarray(values, dtype=dtype)
+    return {
+        names_key: list(names),
+        "values_b64": base64.b64encode(values.data).decode(),
+        "shape": list(values.shape),
+        "dtype": values.dtype.name,
+    }
+
+
+def _decode_columnar(payload: Dict[str, Any], names_key: str) -> Tuple[List[str], np.ndarray]:
+    """Unpack a payload built by ``_encode_columnar``"""
+    dtype = np.dtype(payload.get("dtype", "float32"))
+    values = np.frombuffer(base64.b64decode(payload["values_b64"]), dtype=dtype)
+    return payload[names_key], values.reshape(payload["shape"])
+
+
 class InferenceClient:
     """Client for calling the inference service
     Uses connection pooling for efficient HTTP requests.
@@ -23,7 +135,17 @@ class InferenceClient:
     pool_connections : int, optional
         Number of connection pools to cache. Default is 10.
     pool_maxsize : int, optional
-        Maximum number of connections to save in the pool. Default is 10.
+        Maximum number of connections to save in the pool. Default is 64.
+    pool_block : bool, optional
+        Whether to block when all pooled connections are in use, instead of
+        opening an extra connection that is discarded afterwards. Default is False.
+    use_msgpack : bool, optional
+        Send prediction requests as msgpack when the msgpack package is installed.
+        Falls back to JSON for good if the service rejects msgpack with 415.
+        Default is False.
+    schema_ttl : float, optional
+        Seconds for which responses of ``get_model_info``, ``get_inputs`` and
+        ``get_outputs`` are cached. Default is 60.
     """
     
     def __init__(
@@ -32,47 +154,73 @@ class InferenceClient:
         timeout: int = 30,
         max_retries: int = 3,
         pool_connections: int = 10,
-        pool_maxsize: int = 10
+        pool_maxsize: int = 64,
+        pool_block: bool = False,
+        use_msgpack: bool = False,
+        schema_ttl: float = 60
     ):
         self.base_url = base_url.rstrip('/')
         self.timeout = timeout
+        self.schema_ttl = schema_ttl
+        self._use_msgpack = use_msgpack and msgpack is not None
+
+        # Metadata responses keyed by URL, as (fetch time, response)
+        self._schema_cache: Dict[str, Tuple[float, Dict[str, Any]]] = {}
+        # Known model input names, used to reject unknown inputs before sending
+        self._input_names: Optional[frozenset] = None
+
+        # Build endpoint URLs once rather than on every request
+        self._health_url = f"{self.base_url}/health"
+        self._model_info_url = f"{self.base_url}/model/info"
+        self._inputs_url = f"{self.base_url}/inputs"
+        self._outputs_url = f"{self.base_url}/outputs"
+        self._predict_url = f"{self.base_url}/predict"
+        self._batch_url = f"{self.base_url}/predict/batch"
+        self._batch_columnar_url = f"{self.base_url}/predict/batch/columnar"
         
-        # Create session with connection pooling
-        self.session = requests.Session()
-        
-        # Configure retry strategy
-        retry_strategy = Retry(
-            total=max_retries,
-            backoff_factor=0.5,  # Wait 0.5s, 1s, 2s between retries
-            status_forcelist=[429, 500, 502, 503, 504],
-            allowed_methods=["HEAD", "GET", "POST", "OPTIONS"]
-        )
-        
-        # Configure HTTP adapter with connection pooling
-        adapter = HTTPAdapter(
-            max_retries=retry_strategy,
-            pool_connections=pool_connections,
-            pool_maxsize=pool_maxsize
-        )
-        
-        # Mount adapter for both http and https
-        self.session.mount("http://", adapter)
-        self.session.mount("https://", adapter)
-        
-        # Set default headers (avoid connection close)
-        self.session.headers.update({
-            'Connection': 'keep-alive',
-            'Content-Type': 'application/json'
-        })
+        # Share one pooled session per service and pool configuration, so every
+        # client instance in the process reuses the same kept-alive connections
+        session_key = (self.base_url, max_retries, pool_connections, pool_maxsize, pool_block)
+        with _SESSION_LOCK:
+            self.session = _SESSION_REGISTRY.get(session_key)
+            if self.session is None:
+                self.session = _build_session(max_retries, pool_connections, pool_maxsize, pool_block)
+                _SESSION_REGISTRY[session_key] = self.session
+        # Bound methods used on the hot paths
+        self._get = self.session.get
+        self._post = self.session.post
         
         logger.info(f"Initialized client for {self.base_url} with connection pooling")
 
-    def __del__(self):
-        """Cleanup: Close session on deletion"""
-        if hasattr(self, 'session'):
-            self.session.close()
+    @staticmethod
+    def _parse_response(response) -> Dict[str, Any]:
+        response.raise_for_status()
+        if response.headers.get("Content-Type", "").startswith(_MSGPACK_TYPE):
+            if msgpack is None:
+                raise RuntimeError(
+                    "Inference service replied with msgpack, but msgpack is not installed"
+                )
+            return msgpack.unpackb(response.content)
+        return _loads(response.content)
+
+    def _post_payload(self, url: str, payload: Dict[str, Any], timeout: float) -> Dict[str, Any]:
+        """POST a payload as msgpack if enabled, otherwise (or if rejected) as JSON"""
+        if self._use_msgpack:
+            response = self._post(
+                url,
+                data=msgpack.packb(payload, default=_numpy_default),
+                headers=_MSGPACK_HEADERS,
+                timeout=timeout
+            )
+            if response.status_code != 415:
+                return self._parse_response(response)
+            # Service does not understand msgpack bodies; use JSON from now on
+            logger.info("Inference service does not accept msgpack, falling back to JSON")
+            self._use_msgpack = False
+
+        response = self._post(url, data=_dumps(payload), timeout=timeout)
+        return self._parse_response(response)
 
-    
     def health_check(self) -> bool:
         """
         Check if the inference service is healthy.
@@ -83,8 +231,8 @@ class InferenceClient:
             True if the service responds with status 200, False otherwise.
         """
         try:
-            response = self.session.get(
-                f"{self.base_url}/health",
+            response = self._get(
+                self._health_url,
                 timeout=5
             )
             return response.status_code == 200
@@ -92,32 +240,47 @@ class InferenceClient:
             logger.error(f"Health check failed: {e}")
             return False
     
-    def get_model_info(self) -> Dict[str, Any]:
-        """Get model metadata"""
-        response = self.session.get(
-            f"{self.base_url}/model/info",
+    def _get_cached(self, url: str) -> Dict[str, Any]:
+        """GET a metadata endpoint, reusing the last response for ``schema_ttl`` seconds"""
+        now = time.monotonic()
+        entry = self._schema_cache.get(url)
+        if entry is not None and now - entry[0] < self.schema_ttl:
+            # Hand out copies so callers cannot modify the cached response
+            return copy.deepcopy(entry[1])
+        response = self._get(
+            url,
             timeout=self.timeout
         )
         response.raise_for_status()
-        return response.json()
+        result = _loads(response.content)
+        self._schema_cache[url] = (now, result)
+        return copy.deepcopy(result)
+
+    def refresh_schema(self):
+        """
+        Drop cached metadata and fetch the model info and input/output specifications.
+
+        Call once after connecting so that later metadata lookups are served from
+        the cache and ``predict`` can check input names before sending a request.
+        """
+        self._schema_cache.clear()
+        self.get_model_info()
+        self.get_inputs()
+        self.get_outputs()
+
+    def get_model_info(self) -> Dict[str, Any]:
+        """Get model metadata (cached for ``schema_ttl`` seconds)"""
+        return self._get_cached(self._model_info_url)
     
     def get_inputs(self) -> Dict[str, Any]:
-        """Get model input specifications"""
-        response = self.session.get(
-            f"{self.base_url}/inputs",
-            timeout=self.timeout
-        )
-        response.raise_for_status()
-        return response.json()
+        """Get model input specifications (cached for ``schema_ttl`` seconds)"""
+        inputs_info = self._get_cached(self._inputs_url)
+        self._input_names = frozenset(inputs_info["input_names"])
+        return inputs_info
     
     def get_outputs(self) -> Dict[str, Any]:
-        """Get model output specifications"""
-        response = self.session.get(
-            f"{self.base_url}/outputs",
-            timeout=self.timeout
-        )
-        response.raise_for_status()
-        return response.json()
+        """Get model output specifications (cached for ``schema_ttl`` seconds)"""
+        return self._get_cached(self._outputs_url)
     
     def predict(self, inputs: Dict[str, float]) -> Dict[str, Any]:
         """
@@ -132,14 +295,17 @@ class InferenceClient:
         -------
         Dict[str, Any]
             Prediction response with outputs.
+
+        Raises
+        ------
+        ValueError
+            If input specifications have been fetched and ``inputs`` contains
+            names the model does not accept, e.g. from a typo in pv_mapping.yaml.
         """
-        response = self.session.post(
-            f"{self.base_url}/predict",
-            json={"inputs": inputs},
-            timeout=self.timeout
-        )
-        response.raise_for_status()
-        return response.json()
+        if self._input_names is not None and not self._input_names.issuperset(inputs):
+            unknown = sorted(set(inputs) - self._input_names)
+            raise ValueError(f"Unknown model inputs: {unknown}")
+        return self._post_payload(self._predict_url, {"inputs": inputs}, self.timeout)
 
     def predict_batch(self, inputs_list: List[Dict[str, float]]) -> Dict[str, Any]:
         """
@@ -155,10 +321,70 @@ class InferenceClient:
         Dict[str, Any]
             Batch prediction response with list of outputs.
         """
-        response = self.session.post(
-            f"{self.base_url}/predict/batch",
-            json={"inputs_list": inputs_list},
+        return self._post_payload(
+            self._batch_url,
+            {"inputs_list": inputs_list},
+            self.timeout * 2  # Longer timeout for batch
+        )
+
+    def predict_batch_columnar(
+        self, names: Sequence[str], values: np.ndarray, dtype=np.float32
+    ) -> Tuple[List[str], np.ndarray]:
+        """
+        Make batch predictions from a 2-D array of inputs.
+
+        Sends one list of input names and the raw bytes of ``values`` instead of
+        one dictionary per sample, which avoids JSON-encoding every key and float.
+        The service replies in the same columnar form.
+
+        Parameters
+        ----------
+        names : Sequence[str]
+            Input names, one per column of ``values``.
+        values : np.ndarray
+            Array of shape (n_samples, len(names)).
+        dtype : numpy dtype, optional
+            Float type the values are sent as, float32 (default) or float64.
+
+        Returns
+        -------
+        Tuple[List[str], np.ndarray]
+            Output names, and array of shape (n_samples, len(output_names)) in the
+            float type the service replied with.
+        """
+        response = self._post(
+            self._batch_columnar_url,
+            data=_dumps(_encode_columnar(names, values, "input_names", dtype)),
             timeout=self.timeout * 2  # Longer timeout for batch
         )
         response.raise_for_status()
-        return response.json()
\ No newline at end of file
+        return _decode_columnar(_loads(response.content), "output_names")
+
+    def predict_array(
+        self, names: Sequence[str], values: np.ndarray, dtype=np.float32
+    ) -> Tuple[List[str], np.ndarray]:
+        """
+        Make a single prediction from an array of input values.
+
+        Sends ``values`` as raw bytes through the columnar endpoint, so no Python
+        float or dictionary is built per input.
+
+        Parameters
+        ----------
+        names : Sequence[str]
+            Input names, in the order of ``values``.
+        values : np.ndarray
+            1-D array of input values.
+        dtype : numpy dtype, optional
+            Float type the values are sent as, float32 (default) or float64.
+
+        Returns
+        -------
+        Tuple[List[str], np.ndarray]
+            Output names as returned by the service, and the 1-D array of outputs
+            in the same order.
+        """
+        output_names, outputs = self.predict_batch_columnar(
+            names, np.reshape(values, (1, -1)), dtype
+        )
+        return output_names, outputs[0]
@@ -1,16 +1,22 @@
 import os
 import logging
 import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
 import epics
 
 logging.basicConfig(
     stream=sys.stdout,
     format="%(asctime)s,%(msecs)03d %(name)s %(levelname)s %(message)s",
     datefmt="%Y-%m-%d %H:%M:%S",
-    level=logging.DEBUG,
+    level=os.environ.get("LOG_LEVEL", "INFO").upper(),
 )
 logger = logging.getLogger(__name__)
 
+# Upper bound on threads waiting for PV connections at the same time
+_MAX_IO_WORKERS = 32
+
 
 class EPICSInterface:
     """Interface for interacting with EPICS Process Variables (PVs)."""
@@ -29,6 +35,9 @@ class EPICSInterface:
             )
 
         self.pv_objects = None
+        self._executor = None
+        # Names of PVs currently connected, maintained by connection callbacks
+        self._connected = set()
         if pv_name_list is not None:
             self.create_pvs(pv_name_list)
 
@@ -46,7 +55,52 @@ class EPICSInterface:
         list
             A dict of EPICS PV objects.
         """
-        self.pv_objects = {name: epics.PV(name) for name in pv_name_list}
+        self.pv_objects = {
+            name: epics.PV(name, connection_callback=self._on_connection_change)
+            for name in pv_name_list
+        }
+        # Connection waits overlap on a bounded pool rather than one thread per PV
+        self._executor = ThreadPoolExecutor(
+            max_workers=min(_MAX_IO_WORKERS, max(len(pv_name_list), 1)),
+            thread_name_prefix="epics-io",
+        )
+        # Channels connect in the background; wait for them up front, each with its
+        # own timeout, rather than on each PV during the first read
+        pvs = list(self.pv_objects.values())
+        for pv, ok in zip(pvs, self._executor.map(self._ensure_connected, pvs)):
+            if not ok:
+                logger.warning(f"PV {pv.pvname} not connected after 5s")
+
+    def _on_connection_change(self, pvname=None, conn=None, **kws):
+        """Keep track of which PVs are connected."""
+        if conn:
+            self._connected.add(pvname)
+        else:
+            self._connected.discard(pvname)
+
+    def _get_pv(self, pv_name):
+        """
+        Return the PV object for a name, creating it on first use.
+
+        Channels are opened once and reused, so PVs not passed to ``create_pvs``
+        only pay the connection handshake on their first read or write.
+        """
+        if self.pv_objects is None:
+            self.pv_objects = {}
+        pv = self.pv_objects.get(pv_name)
+        if pv is None:
+            pv = epics.PV(pv_name, connection_callback=self._on_connection_change)
+            self.pv_objects[pv_name] = pv
+        if self._executor is None:
+            # Threads are only started as needed, up to the bound
+            self._executor = ThreadPoolExecutor(
+                max_workers=_MAX_IO_WORKERS, thread_name_prefix="epics-io"
+            )
+        return pv
+
+    def _ensure_connected(self, pv, timeout=5):
+        """Return True if the PV is connected, only waiting if it is not already known to be."""
+        return pv.pvname in self._connected or pv.wait_for_connection(timeout=timeout)
 
     def get_input_variables(self, input_pvs: list) -> dict:
         """
@@ -62,47 +116,167 @@ class EPICSInterface:
         dict
             Dictionary mapping PV names to their values and POSIX timestamps, or error info if retrieval fails.
         """
-        results = {}
-        for pv in input_pvs:
-            pv = self.pv_objects[pv]
-            try:
-                # Wait for the connection to be established
-                if pv.wait_for_connection(timeout=5):
-                    time_data = pv.get_timevars()
+        pvs = [self._get_pv(pv) for pv in input_pvs]
+        errors = {}
 
-                    # Extract value and timestamp
-                    value = pv.get()
-                    timestamp = time_data["posixseconds"]
+        # Wait concurrently for any PVs not already connected
+        unconnected = [pv for pv in pvs if pv.pvname not in self._connected]
+        for pv, ok in zip(unconnected, self._executor.map(self._ensure_connected, unconnected)):
+            if not ok:
+                errors[pv.pvname] = "Connection failed"
+
+        # Monitored PVs are read from the monitor cache. For the rest, issue all CA
+        # gets without waiting and flush once, so replies arrive in one round trip
+        pending = {}
+        for pv in pvs:
+            if pv.pvname in errors or pv.auto_monitor:
+                continue
+            try:
+                ftype = epics.ca.promote_type(pv.chid, use_time=True)
+                epics.ca.get_with_metadata(pv.chid, ftype=ftype, wait=False)
+                pending[pv.pvname] = ftype
+            except Exception as e:
+                errors[pv.pvname] = str(e)
+                logger.error(f"Error retrieving PV {pv.pvname}: {e}")
+        if pending:
+            epics.ca.flush_io()
 
-                    results[pv.pvname] = {"value": value, "posixseconds": timestamp}
+        results = {}
+        for pv in pvs:
+            if pv.pvname in errors:
+                results[pv.pvname] = {"error": errors[pv.pvname]}
+                continue
+            try:
+                if pv.pvname in pending:
+                    data = epics.ca.get_complete_with_metadata(
+                        pv.chid, ftype=pending[pv.pvname], timeout=5
+                    )
                 else:
-                    results[pv.pvname] = {"error": "Connection failed"}
+                    data = pv.get_with_metadata(form="time")
+                if data is None:
+                    results[pv.pvname] = {"error": "Get timed out"}
+                else:
+                    results[pv.pvname] = {
+                        "value": data["value"],
+                        "posixseconds": data["posixseconds"],
+                    }
             except Exception as e:
                 results[pv.pvname] = {"error": str(e)}
                 logger.error(f"Error retrieving PV {pv.pvname}: {e}")
         return results
 
-    def put_output_variables(self, output_dict: dict):
+    def monitor(self, input_pvs: list, min_period: float = 0.0, timeout: float = None):
+        """
+        Wait for input PVs to change, yielding once per batch of updates.
+
+        A value callback is added to each PV's monitor, so the caller is woken by the
+        IOC instead of polling. Updates that arrive while the caller is busy, or within
+        ``min_period`` of the previous yield, are coalesced into the next one. PVs too
+        large to be auto-monitored post no updates; use ``timeout`` to still wake up
+        periodically. The first yield comes right after subscribing, before any update,
+        so the caller can run its first iteration without missing changes.
+
+        Parameters
+        ----------
+        input_pvs : list of str
+            List of EPICS PV names to watch.
+        min_period : float, optional
+            Minimum time in seconds between two yields. Defaults to 0.
+        timeout : float, optional
+            Maximum time in seconds to wait for an update before yielding anyway.
+            By default waits indefinitely.
+
+        Yields
+        ------
+        set of str
+            Names of the PVs that changed since the previous yield (empty on timeout,
+            and for the first yield).
+        """
+        changed = set()
+        lock = threading.Lock()
+        updated = threading.Event()
+
+        def on_update(pvname=None, **kws):
+            with lock:
+                changed.add(pvname)
+                updated.set()
+
+        callbacks = [(pv, pv.add_callback(on_update)) for pv in map(self._get_pv, input_pvs)]
+        try:
+            last = time.monotonic()
+            yield set()
+            while True:
+                updated.wait(timeout)
+                delay = last + min_period - time.monotonic()
+                if delay > 0:
+                    time.sleep(delay)
+                with lock:
+                    updated.clear()
+                    names = set(changed)
+                    changed.clear()
+                last = time.monotonic()
+                yield names
+        finally:
+            for pv, index in callbacks:
+                pv.remove_callback(index)
+
+    def put_output_variables(self, output_dict: dict, confirm_timeout: float = None):
         """
         Write values to EPICS output PVs.
 
+        Puts are issued without waiting for the IOC to process each one; each put is
+        flushed as it is issued.
+
         Parameters
         ----------
         output_dict : dict
             Dictionary mapping PV names to their values to be written.
+        confirm_timeout : float, optional
+            If given, wait up to this many seconds in total for all puts to complete,
+            and log the PVs whose puts did not. By default puts are not confirmed.
 
         Returns
         -------
         None
         """
-        # TODO: need to instantiate PV objects first (WIP)
+        # Names of puts awaiting completion; the CA put callback removes each one
+        # and sets the event once none are left, so confirming does not poll
+        unconfirmed = set()
+        lock = threading.Lock()
+        all_confirmed = threading.Event()
+
+        def on_put_complete(pvname=None, **kws):
+            with lock:
+                unconfirmed.discard(pvname)
+                if not unconfirmed:
+                    all_confirmed.set()
+
+        callback = on_put_complete if confirm_timeout is not None else None
         for pv_name, value in output_dict.items():
-            pv = self.pv_objects[pv_name]
+            pv = self._get_pv(pv_name)
             try:
                 # Wait for the connection to be established
-                if pv.wait_for_connection(timeout=5):
-                    pv.put(value)
+                if self._ensure_connected(pv):
+                    if callback is not None:
+                        # An earlier put may already have completed and set the
+                        # event while nothing else was pending
+                        with lock:
+                            unconfirmed.add(pv.pvname)
+                            all_confirmed.clear()
+                    pv.put(value, wait=False, use_complete=True, callback=callback)
                 else:
                     logger.error(f"Connection failed for PV {pv.pvname}")
             except Exception as e:
+                with lock:
+                    unconfirmed.discard(pv.pvname)
                 logger.error(f"Error writing to PV {pv.pvname}: {e}")
+        epics.ca.flush_io()
+
+        if confirm_timeout is not None:
+            with lock:
+                if not unconfirmed:
+                    all_confirmed.set()
+            all_confirmed.wait(confirm_timeout)
+            with lock:
+                for pv_name in sorted(unconfirmed):
+                    logger.error(f"Put to PV {pv_name} not confirmed after {confirm_timeout}s")
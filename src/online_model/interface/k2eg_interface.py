@@ -1,6 +1,8 @@
 import logging
+import os
 import time
 import sys
+from concurrent.futures import ThreadPoolExecutor
 import k2eg
 from k2eg.serialization import Scalar
 from online_model.exceptions import OutputWriteFailure
@@ -9,7 +11,7 @@ logging.basicConfig(
     stream=sys.stdout,
     format="%(asctime)s,%(msecs)03d %(name)s %(levelname)s %(message)s",
     datefmt="%Y-%m-%d %H:%M:%S",
-    level=logging.DEBUG,
+    level=os.environ.get("LOG_LEVEL", "INFO").upper(),
 )
 logger = logging.getLogger(__name__)
 
@@ -25,7 +27,10 @@ class K2EGInterface:
     """
 
     def __init__(
-        self, environment_id: str = "lcls", app_name: str = "app-ad-online-ml"
+        self,
+        environment_id: str = "lcls",
+        app_name: str = "app-ad-online-ml",
+        max_workers: int = 16,
     ):
         """
         Initializes the K2EGInterface with a K2EG client.
@@ -36,9 +41,16 @@ class K2EGInterface:
             The environment ID for the K2EG client (e.g., 'lcls').
         app_name : str
             The application name for the K2EG client (e.g., 'app-three').
+        max_workers : int, optional
+            Maximum number of PV requests in flight at once (default is 16).
         """
         self.k2eg_client = k2eg.dml(environment_id, app_name)
         self.name = "k2eg"
+        # The k2eg client waits for replies without holding its lock, so requests
+        # issued from several threads overlap instead of running back to back
+        self._executor = ThreadPoolExecutor(
+            max_workers=max_workers, thread_name_prefix="k2eg-io"
+        )
 
     def get_pv(self, pv_name: str, timeout: float = 5.0, proto: str = "ca") -> Scalar:
         """
@@ -118,10 +130,10 @@ class K2EGInterface:
 
         def _all_pvs(protos):
             """get pvs with consistent timestamps"""
-            for var, proto in zip(input_pvs, protos):
-                if (rv := _pv(var, proto)) is None:
-                    return
-                yield var, dict(value=rv["value"], posixseconds=rv["timeStamp"]["secondsPastEpoch"])
+            # Issue all gets concurrently rather than one RPC after another
+            for var, rv in zip(input_pvs, self._executor.map(_pv, input_pvs, protos)):
+                if rv is not None:
+                    yield var, dict(value=rv["value"], posixseconds=rv["timeStamp"]["secondsPastEpoch"])
 
         def _protos():
             if protos is None:
@@ -179,36 +191,48 @@ class K2EGInterface:
         elif len(protos) != len(output_dict):
             raise ValueError(f"Length of protos ({len(protos)}) must match length of output_dict ({len(output_dict)}).")
 
-        for (var, value), proto in zip(output_dict.items(), protos):
-            last_error = None
-        
-            for attempt in range(max_retries):
-                try:
-                    self.put_pv(var, value, proto=proto)
-                    # Success
-                    if attempt > 0:
-                        logging.info(f"Successfully put PV {var}")
-                    break  # Move to next PV
-                
-                except Exception as e:
-                    last_error = e
-                    if attempt < max_retries - 1:
-                        logging.warning(
-                            f"Transient failure putting PV {var} (attempt {attempt + 1}/{max_retries}): {e}. Retrying..."
-                        )
-                        time.sleep(retry_delay)
-                    else:
-                        logging.error(
-                            f"Failed to put PV {var} after {max_retries} attempts: {e}"
-                            f"Outputs are now stale - iteration will restart with fresh inputs."
-                        )
-                        raise OutputWriteFailure(
-                        f"Failed to put PV {var} after {max_retries} attempts. "
-                        f"Last error: {last_error}"
+        # Issue all puts concurrently; each PV keeps its own retries, and any PV that
+        # still fails makes the whole write fail so the iteration restarts
+        futures = [
+            self._executor.submit(self._put_with_retries, var, value, proto, max_retries, retry_delay)
+            for (var, value), proto in zip(output_dict.items(), protos)
+        ]
+        failures = [f.exception() for f in futures if f.exception() is not None]
+        if failures:
+            raise failures[0]
+
+    def _put_with_retries(self, var, value, proto, max_retries, retry_delay):
+        """Put a single PV, retrying transient failures before raising OutputWriteFailure."""
+        last_error = None
+    
+        for attempt in range(max_retries):
+            try:
+                self.put_pv(var, value, proto=proto)
+                # Success
+                if attempt > 0:
+                    logging.info(f"Successfully put PV {var}")
+                return
+            
+            except Exception as e:
+                last_error = e
+                if attempt < max_retries - 1:
+                    logging.warning(
+                        f"Transient failure putting PV {var} (attempt {attempt + 1}/{max_retries}): {e}. Retrying..."
+                    )
+                    time.sleep(retry_delay)
+                else:
+                    logging.error(
+                        f"Failed to put PV {var} after {max_retries} attempts: {e}"
+                        f"Outputs are now stale - iteration will restart with fresh inputs."
                     )
+                    raise OutputWriteFailure(
+                    f"Failed to put PV {var} after {max_retries} attempts. "
+                    f"Last error: {last_error}"
+                )
 
     def close(self):
         """
         Closes the K2EG client connection.
         """
+        self._executor.shutdown(wait=False)
         self.k2eg_client.close()
\ No newline at end of file
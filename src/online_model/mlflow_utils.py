@@ -1,13 +1,35 @@
+import functools
 import logging
-import mlflow
-from mlflow import MlflowClient
-from mlflow.models.model import get_model_info
-from lume_torch.models import TorchModel, TorchModule
+import os
+import queue
+import shutil
+import tempfile
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from pathlib import Path
 from online_model.configs.template_config import mlflow_tracking_uri, deployment_name
 
+# mlflow and lume_torch (which pulls in torch) take seconds to import, so they are
+# imported inside the methods that need them rather than when this module loads
+
 
 logger = logging.getLogger(__name__)
 
+# Single background worker for model downloads, so they overlap with other startup work
+_model_loader = ThreadPoolExecutor(max_workers=1, thread_name_prefix="model-loader")
+
+# Downloaded model artifacts are kept here, so restarts of the pod reuse them
+MODEL_CACHE_DIR = Path(os.environ.get("MODEL_CACHE_DIR", "/tmp/model_cache"))
+
+
+def _like_safe_prefix(prefix):
+    """Longest leading part of ``prefix`` that needs no escaping in a LIKE filter."""
+    for i, char in enumerate(prefix):
+        if char in "%_'\"\\":
+            return prefix[:i]
+    return prefix
+
 
 class MLflowRun:
     """
@@ -43,6 +65,8 @@ class MLflowRun:
         """
         Start an MLflow run and return the run object.
         """
+        import mlflow
+
         self.run = mlflow.start_run(run_name=self.run_name, tags=self.tags)
         logger.info(f"Started MLflow run: {self.run_name}")
         return self.run
@@ -51,6 +75,8 @@ class MLflowRun:
         """
         End the MLflow run when exiting the context.
         """
+        import mlflow
+
         mlflow.end_run()
 
     def setup_experiment(self):
@@ -62,38 +88,192 @@ class MLflowRun:
         str
             The generated run name for the new MLflow run.
         """
+        import mlflow
+
         logger.debug("Setting up MLflow experiment...")
         mlflow.set_tracking_uri(self.tracking_uri)
         mlflow.set_experiment(self.experiment_name)
 
-        client = mlflow.tracking.MlflowClient()
+        # Keep the client so the run's other requests reuse it and its tracking store
+        self.client = client = mlflow.tracking.MlflowClient()
         experiment = client.get_experiment_by_name(self.experiment_name)
 
-        # Get next run name
-        all_runs = client.search_runs(experiment_ids=[experiment.experiment_id])
+        # Get next run name from the highest number among runs with our prefix.
+        # The server-side filter only narrows the search; LIKE escaping differs
+        # between tracking stores, so it uses the prefix up to the first character
+        # that would need escaping and the prefix itself is checked here.
+        like_prefix = _like_safe_prefix(self.run_prefix)
+        filter_string = f"attributes.run_name LIKE '{like_prefix}%'" if like_prefix else ""
         run_numbers = []
-
-        for run in all_runs:
-            tag = run.data.tags.get("mlflow.runName", "")
-            if tag.startswith(self.run_prefix):
-                try:
-                    num = int(tag.replace(self.run_prefix, "").strip())
-                    run_numbers.append(num)
-                except ValueError:
-                    continue
+        page_token = None
+        while True:
+            runs = client.search_runs(
+                experiment_ids=[experiment.experiment_id],
+                filter_string=filter_string,
+                max_results=1000,
+                page_token=page_token,
+            )
+            for run in runs:
+                tag = run.data.tags.get("mlflow.runName", "")
+                if tag.startswith(self.run_prefix):
+                    try:
+                        run_numbers.append(int(tag[len(self.run_prefix):].strip()))
+                    except ValueError:
+                        continue
+            page_token = runs.token
+            if not page_token:
+                break
 
         next_run_number = max(run_numbers, default=0) + 1
         return self.run_prefix + str(next_run_number)
 
 
+class MetricLogWorker(threading.Thread):
+    """
+    Logs metrics to an MLflow run from a background thread.
+
+    ``log_metrics`` only queues the metrics of one step and returns immediately, so
+    the evaluation loop never waits on the tracking server. The worker thread sends
+    whatever has queued up, at most ``max_batch_steps`` steps at a time, with
+    ``MlflowClient.log_batch``. If the queue is full, the oldest step is dropped.
+    Call ``close`` before the run ends to send everything queued and stop the thread.
+
+    Parameters
+    ----------
+    run_id : str
+        ID of the MLflow run to log to.
+    max_batch_steps : int, optional
+        Maximum number of steps sent in one request (default is 10).
+    maxsize : int, optional
+        Maximum number of steps waiting to be sent (default is 1024).
+    client : MlflowClient, optional
+        Client to log with. A new client is created if not given.
+    """
+
+    # MLflow accepts at most this many metrics in one log_batch request
+    MAX_METRICS_PER_BATCH = 1000
+    _STOP = object()
+
+    def __init__(self, run_id, max_batch_steps=10, maxsize=1024, client=None):
+        from mlflow import MlflowClient
+
+        super().__init__(name="mlflow-log-worker", daemon=True)
+        self.run_id = run_id
+        self.max_batch_steps = max_batch_steps
+        self.client = client if client is not None else MlflowClient()
+        self.step = 0
+        self._queue = queue.Queue(maxsize=maxsize)
+        self.start()
+
+    def log_metrics(self, metrics, timestamp):
+        """
+        Queue one step of metrics to be logged.
+
+        The dictionary is queued as-is and read later on the worker thread, so the
+        caller must not modify or reuse it after this call.
+
+        Parameters
+        ----------
+        metrics : dict
+            Dictionary of metric names and values.
+        timestamp : int
+            Wall clock time of the step, in milliseconds since the epoch.
+        """
+        if not self.is_alive():
+            logger.error("MLflow logging worker is not running, metrics not logged")
+            return
+        item = (metrics, timestamp, self.step)
+        self.step += 1
+        self._put_dropping_oldest(item)
+
+    def _put_dropping_oldest(self, item):
+        """Queue an item without blocking, dropping the oldest step if the queue is full."""
+        while True:
+            try:
+                self._queue.put_nowait(item)
+                return
+            except queue.Full:
+                try:
+                    self._queue.get_nowait()
+                    logger.warning("MLflow logging queue is full, dropped the oldest metrics")
+                except queue.Empty:
+                    pass
+
+    def close(self, timeout=None):
+        """
+        Send all queued metrics and stop the worker thread.
+
+        Parameters
+        ----------
+        timeout : float, optional
+            Maximum time in seconds to wait for the queued metrics to be sent. By
+            default waits until they are sent, however long the tracking server takes.
+        """
+        if not self.is_alive():
+            return
+        deadline = None if timeout is None else time.monotonic() + timeout
+        try:
+            # Wait for room rather than dropping a queued step for the stop marker
+            self._queue.put(self._STOP, timeout=timeout)
+        except queue.Full:
+            self._put_dropping_oldest(self._STOP)
+        self.join(None if deadline is None else max(deadline - time.monotonic(), 0))
+        if self.is_alive():
+            logger.warning("Timed out waiting for queued metrics to be sent to MLflow")
+
+    def run(self):
+        stop = False
+        while not stop:
+            batch = []
+            item = self._queue.get()
+            while True:
+                if item is self._STOP:
+                    stop = True
+                    break
+                batch.append(item)
+                if len(batch) >= self.max_batch_steps:
+                    break
+                try:
+                    item = self._queue.get_nowait()
+                except queue.Empty:
+                    break
+            if batch:
+                try:
+                    self._send(batch)
+                except Exception as e:
+                    # Never let one bad batch stop the worker
+                    logger.error(f"Failed to log metrics to MLflow: {e}")
+
+    def _send(self, batch):
+        from mlflow.entities import Metric
+
+        metrics = []
+        for step_metrics, timestamp, step in batch:
+            for key, value in step_metrics.items():
+                try:
+                    metrics.append(Metric(key, float(value), timestamp, step))
+                except (TypeError, ValueError) as e:
+                    logger.warning(f"Skipping metric {key}, value is not a scalar: {e}")
+        try:
+            for i in range(0, len(metrics), self.MAX_METRICS_PER_BATCH):
+                self.client.log_batch(
+                    self.run_id, metrics=metrics[i : i + self.MAX_METRICS_PER_BATCH]
+                )
+        except Exception as e:
+            logger.error(f"Failed to log {len(metrics)} metrics to MLflow: {e}")
+
+
 class MLflowModelGetter:
     # Adapted from Mat Leputa's poly-lithic implementation
     # https://github.com/ISISNeutronMuon/poly-lithic/blob/main/poly_lithic/src/model_utils/MlflowModelGetter.py
     def __init__(self, model_name, model_version=None, model_uri=None):
+        import mlflow
+        from mlflow import MlflowClient
+
         # either supply version or URI
-        if "model_version" != None:
+        if model_version is not None:
             model_uri = None
-        elif "model_uri" != None:
+        elif model_uri is not None:
             model_version = None
         else:
             raise ValueError("Either model_version or model_uri must be supplied")
@@ -108,6 +288,8 @@ class MLflowModelGetter:
         self.client = MlflowClient()
         self.model_type = None
         self.tags = None
+        self._model_info = None
+        self._cached_model = None
 
     # def get_requirements(self):
     #     # Determine model version
@@ -133,18 +315,89 @@ class MLflowModelGetter:
     #     return deps
 
     def get_model(self):
+        """
+        Load the model from MLflow, downloading it only on the first call.
+
+        Returns
+        -------
+        The loaded LUME model.
+        """
+        if self._cached_model is None:
+            self._cached_model = self._load_model()
+        return self._cached_model
+
+    def get_model_async(self) -> Future:
+        """
+        Start loading the model in a background thread.
+
+        Lets the caller set up interfaces while the model downloads, and block on
+        ``future.result()`` only when the model is first needed.
+
+        Returns
+        -------
+        concurrent.futures.Future
+            Future resolving to the loaded model, as returned by ``get_model``.
+        """
+        return _model_loader.submit(self.get_model)
+
+    def _cached_artifacts(self, source):
+        """
+        Return a local copy of the model artifacts, downloading them only once.
+
+        Only numbered versions are cached: the artifacts of a registered model
+        version never change, while an alias can point to a new version at any time.
+
+        Parameters
+        ----------
+        source : str
+            Artifact URI of the registered model version.
+
+        Returns
+        -------
+        str
+            Local path of the artifacts, or ``source`` if they cannot be cached.
+        """
+        import mlflow
+
+        if not str(self.model_version).isdigit():
+            return source
+        cache_dir = MODEL_CACHE_DIR / f"{self.model_name}_{self.model_version}"
+        if cache_dir.is_dir():
+            logger.info(f"Using cached model artifacts in {cache_dir}")
+            return str(cache_dir)
+        try:
+            MODEL_CACHE_DIR.mkdir(parents=True, exist_ok=True)
+            # Download next to the cache entry and rename it into place, so an
+            # interrupted download never leaves a partial entry behind
+            tmp_dir = tempfile.mkdtemp(dir=MODEL_CACHE_DIR)
+            try:
+                local_path = mlflow.artifacts.download_artifacts(
+                    artifact_uri=source, dst_path=tmp_dir
+                )
+                os.rename(local_path, cache_dir)
+            finally:
+                shutil.rmtree(tmp_dir, ignore_errors=True)
+        except OSError as e:
+            logger.warning(f"Could not cache model artifacts in {cache_dir}: {e}")
+            return source
+        logger.info(f"Cached model artifacts in {cache_dir}")
+        return str(cache_dir)
+
+    def _load_model(self):
+        import mlflow
+        from mlflow.models.model import get_model_info
+        from lume_torch.models import TorchModel, TorchModule
+
         if self.model_uri is not None:
             model_uri = self.model_uri
-        elif self.model_version is not None:  # TODO: why is this different from above?
-            version = self.client.get_model_version(self.model_name, self.model_version)
-            model_uri = version.source
         else:
-            raise Exception(
-                "Either model_version and model name or model_uri must be supplied"
-            )
+            version = self.client.get_model_version(self.model_name, self.model_version)
+            model_uri = self._cached_artifacts(version.source)
 
         # flavor
-        flavor = get_model_info(model_uri=model_uri).flavors
+        if self._model_info is None:
+            self._model_info = get_model_info(model_uri=model_uri)
+        flavor = self._model_info.flavors
         loader_module = flavor["python_function"]["loader_module"]
         logger.debug(f"Loader module: {loader_module}")
 
@@ -184,3 +437,22 @@ class MLflowModelGetter:
             return model
         else:
             raise Exception(f"Flavor {flavor} not supported")
+
+
+@functools.lru_cache(maxsize=None)
+def get_cached_model(model_name, model_version):
+    """
+    Load a registered model version once per process.
+
+    Parameters
+    ----------
+    model_name : str
+        Name of the registered model.
+    model_version : str
+        Version of the registered model.
+
+    Returns
+    -------
+    The loaded LUME model, as returned by ``MLflowModelGetter.get_model``.
+    """
+    return MLflowModelGetter(model_name, model_version).get_model()
@@ -1,13 +1,11 @@
 import argparse
 import sys
 import logging
+import threading
 import time
-import collections
 from pathlib import Path
 from typing import List, Dict, Optional, Tuple
-import yaml
-import mlflow
-from online_model.mlflow_utils import MLflowRun
+from online_model.mlflow_utils import MLflowRun, MetricLogWorker
 from online_model.configs.template_config import (
     registered_model_name,
     rate,
@@ -20,6 +18,7 @@ import os
 import random
 import math
 import numpy as np
+import requests
 
 from online_model.client import InferenceClient
 from online_model.exceptions import OutputWriteFailure
@@ -30,7 +29,8 @@ logging.basicConfig(
     stream=sys.stdout,
     format="%(asctime)s,%(msecs)03d %(name)s %(levelname)s %(message)s",
     datefmt="%Y-%m-%d %H:%M:%S",
-    level=logging.DEBUG,
+    # Set LOG_LEVEL=DEBUG to see per-iteration values
+    level=os.environ.get("LOG_LEVEL", "INFO").upper(),
 )
 logger = logging.getLogger(__name__)
 
@@ -39,12 +39,75 @@ CONFIG_PATH = Path(__file__).parent / "configs" / "pv_mapping.yaml"
 # Get model version from environment variable, default to 1 if not set (test environment)
 model_version = os.environ.get("MODEL_VERSION", "1")
 INFERENCE_SERVICE_URL = os.environ.get("INFERENCE_SERVICE_URL", "http://inference-service:8000")
+# Directory for formulas compiled to C; unset to evaluate formulas with numpy/numba
+FORMULA_CACHE_DIR = os.environ.get("FORMULA_CACHE_DIR")
+# With --on-change, run anyway after this many rate periods without input PV updates
+ON_CHANGE_WATCHDOG_PERIODS = 5
 
 
-class MultiLineDict(collections.UserDict):
+class MultiLineDict:
+    """Lazily formats a dict one item per line; wraps it without copying."""
+
+    __slots__ = ("data",)
+
+    def __init__(self, data):
+        self.data = data
+
     def __str__(self):
         return "\n" + "\n".join(f"{k} = {v}" for k, v in self.data.items())
 
+def load_config(path):
+    """
+    Load the PV mapping configuration.
+
+    PyYAML is imported here, as it is only needed once at start-up.
+
+    Parameters
+    ----------
+    path : str or Path
+        Path to the YAML configuration file.
+
+    Returns
+    -------
+    dict
+        The parsed configuration.
+    """
+    import yaml
+
+    try:
+        # libyaml-backed loader, much faster than the pure-Python one
+        from yaml import CSafeLoader as Loader
+    except ImportError:
+        from yaml import SafeLoader as Loader
+
+    with open(path, "r") as f:
+        return yaml.load(f, Loader=Loader)
+
+
+def log_lockfile(client, run_id):
+    """
+    Upload the pixi lockfile to the MLflow run.
+
+    Uses the client API with an explicit run ID, as MLflow's active run is
+    thread-local and this may run in a background thread.
+
+    Parameters
+    ----------
+    client : mlflow.MlflowClient
+        The MLflow client to upload with.
+    run_id : str
+        ID of the run to attach the lockfile to.
+    """
+    try:
+        client.log_artifact(run_id, PIXI_LOCKFILE_PATH, "pixi_lockfile")
+    except FileNotFoundError:
+        logger.error(
+            f"Lockfile {PIXI_LOCKFILE_PATH} not found. Continuing without logging it."
+        )
+    except Exception as e:
+        logger.error(f"Failed to log lockfile {PIXI_LOCKFILE_PATH} to MLflow: {e}")
+
+
 def validate_inputs(input_dict: Dict[str, float]) -> Tuple[bool, List[str]]:
     """
     Validate input dictionary for Nan/Inf values
@@ -93,78 +156,101 @@ def get_interface(interface_name, pvname_list=None):
         raise ValueError(f"Unknown interface: {interface_name}")
 
 
-def get_model_inputs(interface, input_pv_transformer, inference_client=None):
+def _generate_test_inputs(inference_client):
     """
-    Step 1: Retrieve and transform inputs for the model based on the interface.
-    Handles test, epics, and k2eg interfaces, including timestamp extraction and logging.
+    Generate random model inputs within the ranges reported by the inference service.
 
     Parameters
     ----------
-    interface : Interface
-         The interface instance (TestInterface, EPICSInterface, or K2EGInterface) for input retrieval.
-    input_pv_transformer : InputPVTransformer
-        The transformer to map and transform input PVs to model inputs.
-    inference_client : InferenceClient, optional
-        Client for the inference service. Required for test interface to retrieve
-        input specifications.
+    inference_client : InferenceClient
+        Client for the inference service, used to retrieve input specifications.
 
     Returns
     -------
     input_dict : dict
-        The dictionary of input values for the model.
-    input_dict_raw : dict or None
-        The raw PV data including timestamps, if applicable (for EPICS/K2EG interfaces).
+        The dictionary of generated input values for the model.
     """
-    if interface.name == "test":
-        if inference_client is None:
-            raise ValueError(
-               "inference_client is required for test interface. "
-                "Pass the InferenceClient instance to get_model_inputs()." 
-            )
-        # Get input specifications from inference service 
-        inputs_info = inference_client.get_inputs()
+    # Get input specifications from inference service 
+    inputs_info = inference_client.get_inputs()
 
-        # Generate random inputs within valid ranges
-        input_dict = {}
-        for name in inputs_info['input_names']:
-            var_info = inputs_info['input_variables'][name]
-            
-            # Use range if available, otherwise use default
-            if var_info.get('range') is not None:
-                min_val, max_val = var_info['range']
-                input_dict[name] = random.uniform(min_val, max_val)
-            elif var_info.get('default') is not None:
-                # If no range but has default, use default +- 10%
-                default = var_info['default']
-                if default != 0:
-                    input_dict[name] = random.uniform(default * 0.9, default * 1.1)
-                else:
-                    input_dict[name] = random.uniform(-1.0, 1.0)
+    # Generate random inputs within valid ranges
+    input_dict = {}
+    for name in inputs_info['input_names']:
+        var_info = inputs_info['input_variables'][name]
+        
+        # Use range if available, otherwise use default
+        if var_info.get('range') is not None:
+            min_val, max_val = var_info['range']
+            input_dict[name] = random.uniform(min_val, max_val)
+        elif var_info.get('default') is not None:
+            # If no range but has default, use default +- 10%
+            default = var_info['default']
+            if default != 0:
+                input_dict[name] = random.uniform(default * 0.9, default * 1.1)
             else:
-                # Fallback: random value between -1 and 1
                 input_dict[name] = random.uniform(-1.0, 1.0)
-        
-        logger.debug(f"Generated test inputs: {MultiLineDict(input_dict)}")
-        input_dict_raw = None
+        else:
+            # Fallback: random value between -1 and 1
+            input_dict[name] = random.uniform(-1.0, 1.0)
+    
+    if logger.isEnabledFor(logging.DEBUG):
+        logger.debug("Generated test inputs: %s", MultiLineDict(input_dict))
+    return input_dict
 
-    elif interface.name in ("epics", "k2eg"):
-        # Get the values of input variables PVs from the interface
-        args = {"input_pvs": input_pv_transformer.input_list}
-        if interface.name == "k2eg":
-            args["protos"] = input_pv_transformer.proto_list
-        input_dict_raw = interface.get_input_variables(**args)
 
-        logger.debug(f"Raw input values from EPICS: {MultiLineDict(input_dict_raw)}")
+def _read_pv_inputs(interface, input_pv_transformer, read_args):
+    """
+    Read input PVs from an EPICS or K2EG interface and transform them to model inputs.
+
+    Parameters
+    ----------
+    interface : Interface
+        The interface instance (EPICSInterface or K2EGInterface) for input retrieval.
+    input_pv_transformer : InputPVTransformer
+        The transformer to map and transform input PVs to model inputs.
+    read_args : dict
+        Keyword arguments for ``interface.get_input_variables``.
+
+    Returns
+    -------
+    input_dict : dict
+        The dictionary of input values for the model.
+    input_dict_raw : dict
+        The raw PV data including timestamps.
+    """
+    # Get the values of input variables PVs from the interface
+    input_dict_raw = interface.get_input_variables(**read_args)
+
+    if logger.isEnabledFor(logging.DEBUG):
+        logger.debug("Raw input values from EPICS: %s", MultiLineDict(input_dict_raw))
 
-        # Get model inputs from PV inputs based on formulas defined in pv_mapping.yaml
-        input_dict = input_pv_transformer.transform(input_dict_raw)
+    # Get model inputs from PV inputs based on formulas defined in pv_mapping.yaml
+    input_dict = input_pv_transformer.transform(input_dict_raw)
+    if logger.isEnabledFor(logging.DEBUG):
         logger.debug(
-            f"Transformed input values from EPICS: {MultiLineDict(input_dict)}"
+            "Transformed input values from EPICS: %s", MultiLineDict(input_dict)
         )
+    return input_dict, input_dict_raw
 
-    else:
-        raise ValueError(f"Unknown interface: {interface.name}")
-    
+
+def _check_model_inputs(input_dict, input_dict_raw):
+    """
+    Validate model inputs, returning ``(None, None)`` if any are NaN/Inf.
+
+    Parameters
+    ----------
+    input_dict : dict
+        The dictionary of input values for the model.
+    input_dict_raw : dict or None
+        The raw PV data including timestamps, if applicable.
+
+    Returns
+    -------
+    input_dict : dict or None
+        The dictionary of input values for the model, or None if invalid.
+    input_dict_raw : dict or None
+        The raw PV data, or None if the inputs are invalid.
+    """
     # VALIDATE INPUTS
     is_valid, invalid_keys = validate_inputs(input_dict)
     
@@ -172,20 +258,36 @@ def get_model_inputs(interface, input_pv_transformer, inference_client=None):
         logger.warning(f"Invalid input values detected: {invalid_keys}")
         
         # Log raw values for debugging (only for epics/k2eg)
-        if input_dict_raw is not None:
+        if input_dict_raw is not None and logger.isEnabledFor(logging.DEBUG):
             logger.debug("Raw PV values for invalid inputs:")
             for invalid_key in invalid_keys:
                 # Extract PV name (remove " (NaN)" or " (Inf)" suffix)
                 pv_name = invalid_key.split(" (")[0]
                 if pv_name in input_dict_raw:
-                    logger.debug(f"  {pv_name} = {input_dict_raw[pv_name]}")
+                    logger.debug("  %s = %s", pv_name, input_dict_raw[pv_name])
         
         return None, None  # Signal invalid inputs
 
-    logger.debug("Input values: %s", MultiLineDict(input_dict))
+    if logger.isEnabledFor(logging.DEBUG):
+        logger.debug("Input values: %s", MultiLineDict(input_dict))
     return input_dict, input_dict_raw
 
 
+def _input_read_args(interface, input_pv_transformer):
+    """Keyword arguments for ``interface.get_input_variables``."""
+    args = {"input_pvs": input_pv_transformer.input_list}
+    if interface.name == "k2eg":
+        args["protos"] = input_pv_transformer.proto_list
+    return args
+
+
+def _output_write_args(interface, output_pv_transformer):
+    """Extra keyword arguments for ``interface.put_output_variables``."""
+    if interface.name == "k2eg":
+        return {"protos": output_pv_transformer.proto_list}
+    return {}
+
+
 def evaluate_model_remote(inference_client, input_dict):
     """
     Step 2: Evaluate the model with the given inputs.
@@ -204,69 +306,144 @@ def evaluate_model_remote(inference_client, input_dict):
         The dictionary of output values from the model.
     """
     try:
-        logger.debug(f"Calling inference service with inputs: {MultiLineDict(input_dict)}")
+        debug = logger.isEnabledFor(logging.DEBUG)
+        if debug:
+            logger.debug("Calling inference service with inputs: %s", MultiLineDict(input_dict))
         prediction = inference_client.predict(input_dict)
         output = prediction['outputs']
-        logger.debug(f"Model output values: {MultiLineDict(output)}")
+        if debug:
+            logger.debug("Model output values: %s", MultiLineDict(output))
         return output 
     except Exception as e:
         logger.error(f"Remote inference failed: {e}")
         raise
 
 
-def write_output_and_log(
-    output, input_dict, input_dict_raw, interface, output_pv_transformer
-):
+def _make_array_evaluator(inference_client, input_names):
     """
-    Step 3: Write output to PVs if applicable and log metrics to MLflow.
-    Handles timestamp for epics/k2eg and logs output values.
+    Build an ``evaluate_model_remote`` equivalent that sends inputs as a float64 array.
+
+    The model's input order is fixed for the lifetime of the process, so inputs are
+    copied into one preallocated buffer and sent as raw bytes, instead of encoding a
+    fresh dictionary every iteration. Falls back to ``evaluate_model_remote`` when the
+    inputs are not all scalars, or for good if the service has no array endpoint
+    (404/405). Outputs are keyed by the names the service returns.
+
+    Parameters
+    ----------
+    inference_client : InferenceClient
+        Client for calling the inference service.
+    input_names : list of str
+        Model input names, in the order expected by the service.
+
+    Returns
+    -------
+    evaluate : callable
+        Takes the input dictionary and returns the output dictionary.
+    """
+    input_names = list(input_names)
+    input_buf = np.empty(len(input_names), dtype=np.float64)
+    use_array = True
+
+    def evaluate(input_dict):
+        nonlocal use_array
+        if use_array:
+            try:
+                for i, name in enumerate(input_names):
+                    input_buf[i] = input_dict[name]
+            except (KeyError, TypeError, ValueError):
+                # Missing or non-scalar inputs: let the service handle the dictionary
+                return evaluate_model_remote(inference_client, input_dict)
+            try:
+                output_names, outputs = inference_client.predict_array(
+                    input_names, input_buf, dtype=np.float64
+                )
+            except requests.HTTPError as e:
+                if e.response is None or e.response.status_code not in (404, 405):
+                    logger.error(f"Remote inference failed: {e}")
+                    raise
+                logger.warning("Inference service does not accept array inputs, falling back to /predict")
+                use_array = False
+            except Exception as e:
+                logger.error(f"Remote inference failed: {e}")
+                raise
+            else:
+                # tolist() gives Python floats, as the JSON endpoint would
+                output = dict(zip(output_names, outputs.tolist()))
+                if logger.isEnabledFor(logging.DEBUG):
+                    logger.debug("Model output values: %s", MultiLineDict(output))
+                return output
+        return evaluate_model_remote(inference_client, input_dict)
+
+    return evaluate
+
+
+def _clean_output(output):
+    """Convert torch.Tensor values in the model output to Python scalars or numpy arrays."""
+    # torch is never imported here just to check types: if nothing else has
+    # imported it, no value can be a tensor
+    torch = sys.modules.get("torch")
+    if torch is None:
+        return dict(output)
+    return {
+        k: _tensor_to_value(v) if isinstance(v, torch.Tensor) else v
+        for k, v in output.items()
+    }
+
+
+def _tensor_to_value(tensor):
+    # 0-d tensors become Python floats directly, without an intermediate array;
+    # numpy(force=True) only copies if the tensor is not already on the CPU
+    if tensor.ndim == 0:
+        return tensor.item()
+    return tensor.numpy(force=True)
+
+
+def _write_output_pvs(interface, output_pv_transformer, cleaned_output, write_args):
+    """
+    Map model outputs to output PVs and write them through the interface.
 
     Parameters
     ----------
-    output : dict
-        The dictionary of output values from the model.
-    input_dict : dict
-        The dictionary of input values for the model.
-    input_dict_raw : dict or None
-        The raw PV data including timestamps, if applicable.
     interface : Interface
-        The interface instance (TestInterface, EPICSInterface, or K2EGInterface).
+        The interface instance (EPICSInterface or K2EGInterface).
     output_pv_transformer : OutputPVTransformer
         The transformer to map and transform model outputs to output PVs.
+    cleaned_output : dict
+        The dictionary of output values from the model, without tensors.
+    write_args : dict
+        Extra keyword arguments for ``interface.put_output_variables``.
     """
-    # Clean output: convert torch.Tensor values to Python scalars
-    cleaned_output = {}
-    for k, v in output.items():
-        try:
-            import torch
-
-            if isinstance(v, torch.Tensor):
-                cleaned_output[k] = v.detach().cpu().numpy()
-            else:
-                cleaned_output[k] = v
-        except ImportError:
-            cleaned_output[k] = v
-
-    # Write output to PVs if applicable
-    if interface.name in ("epics", "k2eg") and output_pv_transformer is not None:
-        output_pv = output_pv_transformer.transform(cleaned_output)
-        args = {"output_dict": output_pv}
-        if interface.name == "k2eg":
-            args["protos"] = output_pv_transformer.proto_list
-        interface.put_output_variables(**args)
+    output_pv = output_pv_transformer.transform(cleaned_output)
+    interface.put_output_variables(output_dict=output_pv, **write_args)
+    if logger.isEnabledFor(logging.DEBUG):
         logger.debug(
-            f"Mapped output values to write to EPICS: {MultiLineDict(output_pv)}"
+            "Mapped output values to write to EPICS: %s", MultiLineDict(output_pv)
         )
-    elif interface.name == "test":
-        logger.info("No PV writing for test interface.")
-        pass
 
+
+def _log_iteration_metrics(output, input_dict, input_dict_raw, metric_logger=None):
+    """
+    Log input and output values of one iteration to MLflow.
+
+    Parameters
+    ----------
+    output : dict
+        The dictionary of output values from the model.
+    input_dict : dict
+        The dictionary of input values for the model.
+    input_dict_raw : dict or None
+        The raw PV data including timestamps, if applicable.
+    metric_logger : MetricLogWorker, optional
+        Background worker that sends metrics to MLflow. If not given, metrics are
+        logged synchronously with mlflow.log_metrics.
+    """
     # Add epics timestamp to DB as well, and log all to wall clock time
-    wall_clock_timestamp_ms = int(time.time()*1000)
+    wall_clock_timestamp_ms = time.time_ns() // 1_000_000
     metrics_to_log = {}
 
     # Add input PVs with their EPICS timestamps (if available)
-    if input_dict_raw is not None and interface.name in ("epics", "k2eg"):
+    if input_dict_raw is not None:
         for pv_name, data in input_dict_raw.items():
             # Log PV value
             metrics_to_log[pv_name] = float(data['value'])
@@ -280,69 +457,43 @@ def write_output_and_log(
     # Add model outputs
     metrics_to_log.update(output)
 
-    mlflow.log_metrics(
-        metrics_to_log,
-        timestamp=wall_clock_timestamp_ms,
-    )
+    if metric_logger is not None:
+        metric_logger.log_metrics(metrics_to_log, wall_clock_timestamp_ms)
+    else:
+        import mlflow
+
+        mlflow.log_metrics(
+            metrics_to_log,
+            timestamp=wall_clock_timestamp_ms,
+        )
 
    
     logger.info("Wrote input and output metrics to MLflow.")
 
 
-def run_iteration(inference_client, interface, input_pv_transformer, output_pv_transformer, max_iteration_retries: int = 10,  iteration_retry_delay: float = 30):
+def _run_with_retries(attempt, max_iteration_retries: int = 10, iteration_retry_delay: float = 30):
     """
-    Orchestrates a single iteration of the model evaluation using the specified interface.
-    Step 1: Input retrieval and transformation
-    Step 2: Model evaluation
-    Step 3: Output writing and logging
-
-    If output writing fails, retries the entire iteration with fresh inputs to ensure
-    outputs are not stale relative to inputs.
+    Run one iteration attempt, restarting it with fresh inputs if output writing fails.
 
     Parameters
     ----------
-    inference_client : InferenceClient
-        Client for calling the remote inference service.
-    interface : Interface
-        The interface instance (TestInterface, EPICSInterface, or K2EGInterface) for
-        input retrieval.
-    input_pv_transformer : InputPVTransformer
-        The transformer to map and transform input PVs to model inputs.
-    output_pv_transformer : OutputPVTransformer
-        The transformer to map and transform model outputs to output PVs.
+    attempt : callable
+        Runs steps 1-3 once. Returns False if the iteration was skipped because of
+        invalid inputs, True otherwise.
     max_iteration_retries : int, optional
         Maximum number of times to retry the entire iteration if outputs fail (default is 10).
     iteration_retry_delay : float, optional
         Delay in seconds before restarting iteration (default is 30).
-
-    Returns
-    -------
-    None
     """
     for iteration_attempt in range(max_iteration_retries):
         try:
             # Step 1: Get inputs (will keep retrying internally until successful)
             if iteration_attempt > 0:
                 logger.info(f"Restarting iteration with fresh inputs (attempt {iteration_attempt + 1}/{max_iteration_retries})...")
-            
-            input_dict, input_dict_raw = get_model_inputs(
-                interface, input_pv_transformer, inference_client
-            )
 
-            # CHECK FOR INVALID INPUTS (NaN/Inf)
-            if input_dict is None:
-                logger.warning("Skipping iteration due to invalid input values (NaN/Inf detected)")
-                logger.info("Will retry on next scheduled iteration")
+            if not attempt():
                 return  # Skip this iteration, main loop will continue after rate delay
 
-            # Step 2: Evaluate model
-            output = evaluate_model_remote(inference_client, input_dict)
-            
-            # Step 3: Write outputs (will retry 3 times, then raise OutputWriteFailure)
-            write_output_and_log(
-                output, input_dict, input_dict_raw, interface, output_pv_transformer
-            )
-            
             # Success - log if it wasn't the first attempt
             if iteration_attempt > 0:
                 logger.info(f"Iteration completed successfully on attempt {iteration_attempt + 1}")
@@ -365,6 +516,138 @@ def run_iteration(inference_client, interface, input_pv_transformer, output_pv_t
                 raise  # Re-raise to main loop
 
 
+def _skip_invalid_inputs():
+    logger.warning("Skipping iteration due to invalid input values (NaN/Inf detected)")
+    logger.info("Will retry on next scheduled iteration")
+    return False
+
+
+def run_iteration(inference_client, interface, input_pv_transformer, output_pv_transformer, max_iteration_retries: int = 10,  iteration_retry_delay: float = 30, metric_logger=None):
+    """
+    Orchestrates a single iteration of the model evaluation using the specified interface.
+    Step 1: Input retrieval and transformation
+    Step 2: Model evaluation
+    Step 3: Output writing and logging
+
+    If output writing fails, retries the entire iteration with fresh inputs to ensure
+    outputs are not stale relative to inputs.
+
+    Builds the runner from ``_make_runner`` and calls it once; a loop should build
+    the runner once and call it on every iteration instead.
+
+    Parameters
+    ----------
+    inference_client : InferenceClient
+        Client for calling the remote inference service.
+    interface : Interface
+        The interface instance (TestInterface, EPICSInterface, or K2EGInterface) for
+        input retrieval.
+    input_pv_transformer : InputPVTransformer
+        The transformer to map and transform input PVs to model inputs.
+    output_pv_transformer : OutputPVTransformer
+        The transformer to map and transform model outputs to output PVs.
+    max_iteration_retries : int, optional
+        Maximum number of times to retry the entire iteration if outputs fail (default is 10).
+    iteration_retry_delay : float, optional
+        Delay in seconds before restarting iteration (default is 30).
+    metric_logger : MetricLogWorker, optional
+        Background worker that sends metrics to MLflow.
+
+    Returns
+    -------
+    None
+    """
+    _make_runner(
+        interface, input_pv_transformer, output_pv_transformer, inference_client,
+        max_iteration_retries, iteration_retry_delay, metric_logger,
+    )()
+
+
+def _make_runner(interface, input_pv_transformer, output_pv_transformer, inference_client, max_iteration_retries: int = 10, iteration_retry_delay: float = 30, metric_logger=None, model_info=None):
+    """
+    Build a callable that runs one iteration, specialized for the selected interface.
+
+    The interface is fixed for the lifetime of the process, so the interface-specific
+    read/write arguments and branches are resolved once here instead of on every
+    iteration.
+
+    Parameters
+    ----------
+    interface : Interface
+        The interface instance (TestInterface, EPICSInterface, or K2EGInterface).
+    input_pv_transformer : InputPVTransformer
+        The transformer to map and transform input PVs to model inputs.
+    output_pv_transformer : OutputPVTransformer or None
+        The transformer to map and transform model outputs to output PVs.
+    inference_client : InferenceClient
+        Client for calling the remote inference service.
+    max_iteration_retries : int, optional
+        Maximum number of times to retry the entire iteration if outputs fail (default is 10).
+    iteration_retry_delay : float, optional
+        Delay in seconds before restarting iteration (default is 30).
+    metric_logger : MetricLogWorker, optional
+        Background worker that sends metrics to MLflow.
+    model_info : dict, optional
+        Model info from the inference service. If given, inputs are sent to the
+        columnar endpoint as a preallocated float64 array ordered by its
+        ``input_names``; otherwise they are sent to ``/predict`` as a dictionary.
+
+    Returns
+    -------
+    runner : callable
+        Runs one iteration when called with no arguments.
+    """
+    if model_info is not None:
+        evaluate = _make_array_evaluator(inference_client, model_info["input_names"])
+    else:
+        def evaluate(input_dict):
+            return evaluate_model_remote(inference_client, input_dict)
+
+    if interface.name == "test":
+        def _attempt_test():
+            input_dict, _ = _check_model_inputs(
+                _generate_test_inputs(inference_client), None
+            )
+            if input_dict is None:
+                return _skip_invalid_inputs()
+            output = evaluate(input_dict)
+            logger.info("No PV writing for test interface.")
+            _log_iteration_metrics(output, input_dict, None, metric_logger)
+            return True
+
+        attempt = _attempt_test
+
+    elif interface.name in ("epics", "k2eg"):
+        read_args = _input_read_args(interface, input_pv_transformer)
+        write_args = None
+        if output_pv_transformer is not None:
+            write_args = _output_write_args(interface, output_pv_transformer)
+
+        def _attempt_pv():
+            input_dict, input_dict_raw = _check_model_inputs(
+                *_read_pv_inputs(interface, input_pv_transformer, read_args)
+            )
+            if input_dict is None:
+                return _skip_invalid_inputs()
+            output = evaluate(input_dict)
+            if write_args is not None:
+                _write_output_pvs(
+                    interface, output_pv_transformer, _clean_output(output), write_args
+                )
+            _log_iteration_metrics(output, input_dict, input_dict_raw, metric_logger)
+            return True
+
+        attempt = _attempt_pv
+
+    else:
+        raise ValueError(f"Unknown interface: {interface.name}")
+
+    def runner():
+        _run_with_retries(attempt, max_iteration_retries, iteration_retry_delay)
+
+    return runner
+
+
 def main():
     """
     Main entry point for running the online model application with CLI interface selection.
@@ -375,6 +658,7 @@ def main():
     You can run the script with:
         python run.py --interface test
         python run.py --interface epics
+        python run.py --interface epics --on-change
 
     Returns
     -------
@@ -390,7 +674,22 @@ def main():
         required=True,
         help="Interface to use",
     )
+    parser.add_argument(
+        "--on-change",
+        action="store_true",
+        help="Run an iteration when an input PV changes, at most once per rate period, "
+        f"and at least once every {ON_CHANGE_WATCHDOG_PERIODS} rate periods, "
+        "instead of on a fixed schedule (epics interface only)",
+    )
+    parser.add_argument(
+        "--array-inputs",
+        action="store_true",
+        help="Send model inputs as one float64 array to the columnar batch endpoint "
+        "(/predict/batch/columnar), if the inference service provides it",
+    )
     args = parser.parse_args()
+    if args.on_change and args.interface != "epics":
+        parser.error("--on-change requires --interface epics")
     logger.info("Starting I/O Service with Remote Inference")
     logger.info(f"Interface: {args.interface}")
     logger.info(f"Inference Service URL: {INFERENCE_SERVICE_URL}")
@@ -404,7 +703,8 @@ def main():
         logger.error("Inference service is not healthy! Check whether service is running in the correct namespace")
         sys.exit(1)
     
-    # Get model info from inference service
+    # Get model info from inference service, caching input/output specs for the loop
+    inference_client.refresh_schema()
     model_info = inference_client.get_model_info()
     logger.info(" Connected to inference service")
     logger.info(f"  Model: {model_info['model_name']} v{model_info['model_version']}")
@@ -415,12 +715,11 @@ def main():
     # This is required to map from EPICS PV names to model input names, and apply any formulas
     # defined in configs/pv_mapping.yaml. This is applicable only for EPICS/k2eg interfaces, and is in addition
     # to the lume-torch's own internal input_transform method, if any are defined.
-    with open(CONFIG_PATH, "r") as f:
-        config_yaml = yaml.safe_load(f)
-    input_pv_transformer = InputPVTransformer(config_yaml)
+    config_yaml = load_config(CONFIG_PATH)
+    input_pv_transformer = InputPVTransformer(config_yaml, ufunc_dir=FORMULA_CACHE_DIR)
     if "output_variables" in config_yaml:
         # User defined output variable mapping
-        output_pv_transformer = OutputPVTransformer(config_yaml)
+        output_pv_transformer = OutputPVTransformer(config_yaml, ufunc_dir=FORMULA_CACHE_DIR)
     else:
         output_pv_transformer = None
 
@@ -441,32 +740,76 @@ def main():
         "model_version": model_version,
     }
 
-    with MLflowRun(tags=run_tags) as _:
-        # Log lockfile for complete reproducibility
-        try:
-            mlflow.log_artifact(PIXI_LOCKFILE_PATH, "pixi_lockfile")
-        except FileNotFoundError:
-            logger.error(
-                f"Lockfile {PIXI_LOCKFILE_PATH} not found. Continuing without logging it."
+    mlflow_run = MLflowRun(tags=run_tags)
+    with mlflow_run as run:
+        # Log lockfile for complete reproducibility, without holding up the first iteration
+        lockfile_upload = threading.Thread(
+            target=log_lockfile,
+            args=(mlflow_run.client, run.info.run_id),
+            name="lockfile-upload",
+            daemon=True,
+        )
+        lockfile_upload.start()
+        # MLflow keeps a pooled keep-alive HTTP session per process; share one client
+        # (and tracking store) between run setup and metric logging
+        metric_logger = MetricLogWorker(run.info.run_id, client=mlflow_run.client)
+        # Resolve the interface-specific steps once, outside the loop
+        runner = _make_runner(
+            interface, input_pv_transformer, output_pv_transformer, inference_client, max_iteration_retries=10, iteration_retry_delay=30, metric_logger=metric_logger,
+            model_info=model_info if args.array_inputs else None,
+        )
+        # With --on-change, wait for input PV monitors instead of the fixed schedule
+        updates = None
+        if args.on_change:
+            # Large array PVs are not auto-monitored and an IOC may stop posting
+            # updates, so never wait on the monitors indefinitely
+            watchdog = ON_CHANGE_WATCHDOG_PERIODS * rate
+            updates = interface.monitor(
+                input_pv_transformer.input_list, min_period=rate, timeout=watchdog
             )
+            next(updates)
         # Run the evaluation loop
-        while True:
-            try:
-                run_iteration(
-                    inference_client, interface, input_pv_transformer, output_pv_transformer,  max_iteration_retries=10, iteration_retry_delay=30
-                )
-                time.sleep(rate)
-            except KeyboardInterrupt:
-                logger.info("Keyboard interrupt received. Exiting.")
-                break
-            except OutputWriteFailure as e:
-            # Iteration failed even after retries with fresh inputs
-            # Log and move to next iteration
-                logger.error(f"Iteration completely failed: {e}. Moving to next iteration cycle.")
-                continue
-            except Exception as e:
-                logger.error(f"Unexpected error: {e}", exc_info=True)
-                raise e
+        try:
+            # Schedule iterations every `rate` seconds from a monotonic clock, so the
+            # time spent in an iteration does not add to the period
+            next_t = time.monotonic()
+            while True:
+                try:
+                    runner()
+                    if updates is not None:
+                        changed = next(updates)
+                        if changed:
+                            logger.debug("Input PVs changed: %s", changed)
+                        else:
+                            logger.warning(
+                                "No input PV updates for %ss, running iteration anyway", watchdog
+                            )
+                        continue
+                    next_t += rate
+                    delay = next_t - time.monotonic()
+                    if delay > 0:
+                        time.sleep(delay)
+                    else:
+                        logger.warning("Iteration overran the %ss period by %.3fs", rate, -delay)
+                        next_t = time.monotonic()
+                except KeyboardInterrupt:
+                    logger.info("Keyboard interrupt received. Exiting.")
+                    break
+                except OutputWriteFailure as e:
+                # Iteration failed even after retries with fresh inputs
+                # Log and move to next iteration
+                    logger.error(f"Iteration completely failed: {e}. Moving to next iteration cycle.")
+                    next_t = time.monotonic()
+                    continue
+                except Exception as e:
+                    logger.error(f"Unexpected error: {e}", exc_info=True)
+                    raise e
+        finally:
+            if updates is not None:
+                updates.close()
+            # Send any metrics still queued before the run ends
+            metric_logger.close(timeout=30)
+            lockfile_upload.join(timeout=30)
 
 
 if __name__ == "__main__":
@@ -1,20 +1,282 @@
+import functools
+import hashlib
+import importlib.machinery
+import importlib.util
+import linecache
 import logging
+import os
+import shutil
 import sys
+import tempfile
+from pathlib import Path
 import numpy as np
 import sympy as sp
 
+try:
+    import numba
+except ImportError:
+    numba = None
+
 logging.basicConfig(
     stream=sys.stdout,
     format="%(asctime)s,%(msecs)03d %(name)s %(levelname)s %(message)s",
     datefmt="%Y-%m-%d %H:%M:%S",
-    level=logging.DEBUG,
+    level=os.environ.get("LOG_LEVEL", "INFO").upper(),
 )
 logger = logging.getLogger(__name__)
+# numba dumps its compiler passes at DEBUG level
+logging.getLogger("numba").setLevel(logging.WARNING)
 
 
 # TODO: make abstract base class for transformers to avoid code duplication
 
 
+def _as_float(value):
+    """
+    Convert a PV or model value to a Python float, or a float64 array for
+    array-like values. Float64 ndarrays are returned without copying.
+    """
+    if np.isscalar(value):
+        return float(value)
+    if value is None:
+        raise TypeError(f"Invalid type for value: {value}, type: {type(value)}")
+    return np.asarray(value, dtype=np.float64)
+
+
+@functools.lru_cache(maxsize=1024)
+def _sympify_formula(formula):
+    """Parse a formula, with ``:`` in PV names replaced by ``_``."""
+    return sp.sympify(formula.replace(":", "_"))
+
+
+@functools.lru_cache(maxsize=1024)
+def _lambdify_formula(arg_names, expr, cse=False):
+    """
+    Lambdify a formula, or a tuple of formulas, with the numpy module.
+
+    Parsed formulas and their functions are cached by value, so transformers built
+    from the same config (or sharing formulas) reuse them.
+    """
+    return sp.lambdify(arg_names, expr, modules="numpy", cse=cse)
+
+
+def _formula_shortcut(expr):
+    """
+    Classify formulas that can be evaluated without calling a lambdified function.
+
+    Parameters
+    ----------
+    expr : sympy.Expr
+        The sympified formula.
+
+    Returns
+    -------
+    tuple or None
+        ``("constant", value)`` for formulas without symbols, ``("passthrough", name)``
+        for formulas that are a single symbol, ``("affine", (a, b, name))`` for
+        formulas of the form ``a * name + b``, or None for anything else.
+    """
+    if isinstance(expr, sp.Symbol):
+        return "passthrough", str(expr)
+    if not expr.free_symbols:
+        try:
+            return "constant", float(expr)
+        except TypeError:
+            # e.g. complex or infinite results, left to lambdify
+            return None
+    # Relationals and other non-Expr formulas (e.g. ``a > 1``) are left to lambdify
+    if isinstance(expr, sp.Expr) and len(expr.free_symbols) == 1:
+        (symbol,) = expr.free_symbols
+        try:
+            poly = expr.as_poly(symbol)
+        except (sp.PolynomialError, AttributeError):
+            return None
+        if poly is not None and poly.degree() == 1:
+            try:
+                a, b = (float(coeff) for coeff in poly.all_coeffs())
+            except TypeError:
+                return None
+            return "affine", (a, b, str(symbol))
+    return None
+
+
+def _formula_args(expr, renamed_symbols):
+    """
+    Names of the arguments a formula's lambdified function takes.
+
+    Only the symbols the formula actually uses are arguments, in the order of
+    ``renamed_symbols``; any symbol not listed there follows, sorted by name.
+    """
+    free = {str(symbol) for symbol in expr.free_symbols}
+    listed = tuple(name for name in renamed_symbols if name in free)
+    return listed + tuple(sorted(free.difference(listed)))
+
+
+# fastmath without the no-NaN/no-Inf assumptions: invalid inputs must still come
+# out as NaN/Inf so the run loop can detect them
+_FASTMATH_FLAGS = {"nsz", "arcp", "contract", "afn", "reassoc"}
+
+
+def _fuse_formulas(keys, formulas, renamed_symbols):
+    """
+    Lambdify several formulas into one function that evaluates them together.
+
+    Subexpressions shared between the formulas are computed once per call.
+
+    Parameters
+    ----------
+    keys : sequence of str
+        Variable names of the formulas to fuse.
+    formulas : dict
+        Sympified formulas by variable name.
+    renamed_symbols : list of str
+        Renamed PV names, in the order arguments should follow.
+
+    Returns
+    -------
+    arg_names : tuple of str
+        Names of the arguments of the fused function.
+    func : callable
+        Returns a list with the value of each formula, in the order of ``keys``.
+    """
+    exprs = tuple(formulas[key] for key in keys)
+    arg_names = _formula_args(sp.Tuple(*exprs), renamed_symbols)
+    return arg_names, _lambdify_formula(arg_names, exprs, cse=True)
+
+
+def _ufunc_formula(arg_names, expr, ufunc_dir):
+    """
+    Compile a formula to a numpy ufunc in C, with sympy's ``ufuncify``.
+
+    Each compiled module is kept in a subdirectory of ``ufunc_dir`` named after a
+    hash of the formula, so later runs load it instead of compiling again. Compiling
+    needs a C compiler and the numpy headers.
+
+    Parameters
+    ----------
+    arg_names : tuple of str
+        Names of the formula's arguments, in call order.
+    expr : sympy.Expr
+        The formula.
+    ufunc_dir : str or path-like
+        Directory holding the compiled modules.
+
+    Returns
+    -------
+    numpy.ufunc or None
+        The compiled formula, or None if it could not be compiled or loaded.
+    """
+    ufunc_dir = Path(ufunc_dir)
+    digest = hashlib.sha256(f"{arg_names}:{sp.srepr(expr)}".encode()).hexdigest()[:16]
+    cache_dir = ufunc_dir / digest
+    try:
+        if not cache_dir.is_dir():
+            from sympy.utilities.autowrap import ufuncify
+
+            ufunc_dir.mkdir(parents=True, exist_ok=True)
+            # Build next to the cache entry and rename it into place, so an
+            # interrupted build never leaves a partial entry behind
+            tmp_dir = tempfile.mkdtemp(dir=ufunc_dir)
+            try:
+                ufunc = ufuncify(
+                    [sp.Symbol(name) for name in arg_names],
+                    expr,
+                    backend="numpy",
+                    tempdir=tmp_dir,
+                )
+                os.rename(tmp_dir, cache_dir)
+                logger.info("Compiled formula %s to C in %s", expr, cache_dir)
+                return ufunc
+            except OSError:
+                # Another process may have compiled the same formula first
+                if not cache_dir.is_dir():
+                    raise
+            finally:
+                shutil.rmtree(tmp_dir, ignore_errors=True)
+        (path,) = cache_dir.glob(
+            "wrapper_module_*" + importlib.machinery.EXTENSION_SUFFIXES[0]
+        )
+        spec = importlib.util.spec_from_file_location(path.name.split(".")[0], path)
+        module = importlib.util.module_from_spec(spec)
+        spec.loader.exec_module(module)
+        return next(v for v in vars(module).values() if isinstance(v, np.ufunc))
+    except Exception as e:
+        logger.warning("Formula %s not compiled to C, using numpy: %s", expr, e)
+        return None
+
+
+def _numba_setting(use_numba, key):
+    """Per-formula numba setting from a transformer's ``numba`` argument."""
+    if isinstance(use_numba, dict):
+        return use_numba.get(key, False)
+    return use_numba
+
+
+def _jit_formula(func, n_args, expr, use_numba=False):
+    """
+    Compile a lambdified formula with numba, if it is installed.
+
+    Compiled formulas follow numpy's floating-point rules for scalars too: division
+    by zero gives inf or nan and invalid operations (e.g. ``a**0.5`` for negative
+    ``a``) give nan, where the numpy function called with Python floats may raise.
+    With fastmath, results may also differ from numpy in the last bits. Compiling
+    is therefore opt-in.
+
+    With ``use_numba=None`` only formulas that call numpy functions (including
+    non-integer powers such as ``sqrt``) are compiled; for plain arithmetic on
+    floats the numba dispatch costs more than it saves. The formula is compiled for
+    float arguments up front, so the first iteration does not pay the compilation.
+    If numba cannot compile the formula, or later cannot type the arguments it is
+    called with, the plain numpy function is used.
+
+    Parameters
+    ----------
+    func : callable
+        Function returned by ``sympy.lambdify`` with ``modules="numpy"``.
+    n_args : int
+        Number of positional arguments of ``func``.
+    expr : sympy.Expr
+        The expression ``func`` was generated from.
+    use_numba : bool or None, optional
+        True to always compile, False (default) to never compile. If None, decide
+        from ``expr`` as described above.
+
+    Returns
+    -------
+    callable
+        The compiled formula, or ``func`` itself.
+    """
+    if numba is None or use_numba is False:
+        return func
+    if use_numba is None:
+        calls_numpy = expr.atoms(sp.Function) or any(
+            not p.exp.is_Integer for p in expr.atoms(sp.Pow)
+        )
+        if not calls_numpy:
+            return func
+    # lambdify'd functions have no source file, so numba cannot cache them on disk
+    jitted = numba.njit(fastmath=_FASTMATH_FLAGS, error_model="numpy", cache=False)(func)
+    try:
+        jitted(*([1.0] * n_args))
+    except Exception as e:
+        logger.debug("Formula not compiled with numba, using numpy: %s", e)
+        return func
+
+    use_jit = True
+
+    def call(*args):
+        nonlocal use_jit
+        if use_jit:
+            try:
+                return jitted(*args)
+            except numba.core.errors.TypingError:
+                logger.debug("Formula arguments not supported by numba, using numpy")
+                use_jit = False
+        return func(*args)
+
+    return call
+
+
 class InputPVTransformer:
     """
     Transforms input PVs based on formulas defined in the configuration dictionary.
@@ -56,7 +318,7 @@ class InputPVTransformer:
         Transforms the input PVs based on the defined formulas.
     """
 
-    def __init__(self, config):
+    def __init__(self, config, numba=False, ufunc_dir=None):
         """
         Initializes the InputPVTransformer with the given configuration.
 
@@ -64,56 +326,105 @@ class InputPVTransformer:
         ----------
         config : dict
             Configuration dictionary containing input variable mappings and formulas.
+        numba : bool, None or dict, optional
+            Whether to compile formulas with numba, if it is installed. True compiles
+            every formula, False (default) none, and None only formulas calling
+            numpy functions. A dict maps variable names to these values for
+            individual formulas; variables missing from it are not compiled.
+            Compiled formulas return inf/nan instead of raising on division by zero
+            or invalid operations.
+        ufunc_dir : str or path-like, optional
+            If given, compile formulas to C numpy ufuncs with sympy's ``ufuncify``,
+            keeping the compiled modules in this directory for later runs. For
+            array-valued PVs this avoids numpy's temporary arrays, where numba is not
+            available; for scalars it is slower, and division by zero gives inf
+            instead of raising. Formulas resolved without a call are not compiled;
+            formulas that fail to compile use ``numba`` or numpy.
         """
         self.pv_mapping = config["input_variables"]
         # Get all symbols (PVs) used in the formulas
         self.input_list = []
         self.proto_list = []
-        for c in self.pv_mapping:
-            try:
-                if (
-                    "symbols" in self.pv_mapping[c]
-                    and self.pv_mapping[c]["symbols"] is not None
-                ):
-                    for symbol in self.pv_mapping[c]["symbols"]:
-                        if symbol not in self.input_list:
-                            self.input_list.append(symbol)
-                            try:
-                                self.proto_list.append(self.pv_mapping[c]["proto"])
-                            except KeyError:
-                                logger.error(
-                                    f"No proto defined for PV {symbol}, defaulting to 'ca'."
-                                )
-                                self.proto_list.append("ca")
-            except KeyError:
-                logger.debug(f"No symbols for {c}")
+        # Set for membership checks; the lists keep the configured order
+        seen = set()
+        for c, mapping in self.pv_mapping.items():
+            symbols = mapping.get("symbols")
+            if symbols is None:
+                logger.debug("No symbols for %s", c)
+                continue
+            proto = mapping.get("proto", "ca")
+            for symbol in symbols:
+                if symbol not in seen:
+                    seen.add(symbol)
+                    self.input_list.append(symbol)
+                    if "proto" not in mapping:
+                        logger.error(
+                            f"No proto defined for PV {symbol}, defaulting to 'ca'."
+                        )
+                    self.proto_list.append(proto)
 
         logger.debug("Initializing Transformer")
-        logger.debug(f"PV Mapping: {self.pv_mapping}")
-        logger.debug(f"Symbol List: {self.input_list}")
+        logger.debug("PV Mapping: %s", self.pv_mapping)
+        logger.debug("Symbol List: %s", self.input_list)
 
+        # Result keys, in config order
+        self._keys = tuple(self.pv_mapping)
+        self.formulas = {}
         for key, value in self.pv_mapping.items():
-            try:
-                self._validate_formulas(str(value["formula"]))
-            except KeyError as e:
+            if "formula" not in value:
                 logger.error(
                     f"No formula defined for {key}. A formula is required in the config."
                 )
-                raise e
-        self.formulas = {}
+                raise KeyError("formula")
+            self.formulas[key] = self._validate_formulas(str(value["formula"]))
         self.lambdified_formulas = {}
-        for key, value in self.pv_mapping.items():
-            self.formulas[key] = sp.sympify(str(value["formula"]).replace(":", "_"))
-            input_list_renamed = [
-                symbol.replace(":", "_") for symbol in self.input_list
-            ]
-            self.lambdified_formulas[key] = sp.lambdify(
-                input_list_renamed, self.formulas[key], modules="numpy"
+        # Constant, single-symbol and affine formulas are resolved in _transform
+        # without a call
+        self._constants = {}
+        self._passthrough = {}
+        self._affine = {}
+        # Renamed PV names, and the subset each formula is called with
+        self._rename_map = {symbol: symbol.replace(":", "_") for symbol in self.input_list}
+        input_list_renamed = list(self._rename_map.values())
+        self._arg_names = {}
+        fused_keys = []
+        for key in self.pv_mapping:
+            shortcut = _formula_shortcut(self.formulas[key])
+            if shortcut is not None:
+                kind, target = shortcut
+                if kind == "constant":
+                    self._constants[key] = target
+                elif kind == "affine":
+                    self._affine[key] = target
+                else:
+                    self._passthrough[key] = target
+                continue
+            arg_names = _formula_args(self.formulas[key], input_list_renamed)
+            self._arg_names[key] = arg_names
+            func = _lambdify_formula(arg_names, self.formulas[key])
+            compiled = None
+            if ufunc_dir is not None:
+                compiled = _ufunc_formula(arg_names, self.formulas[key], ufunc_dir)
+            if compiled is None:
+                compiled = _jit_formula(
+                    func, len(arg_names), self.formulas[key], _numba_setting(numba, key)
+                )
+            self.lambdified_formulas[key] = compiled
+            if self.lambdified_formulas[key] is func:
+                fused_keys.append(key)
+        # Formulas not compiled with numba are evaluated together in one call
+        self._fused_keys = tuple(fused_keys)
+        self._fused_args, self._fused_formula = (), None
+        if fused_keys:
+            self._fused_args, self._fused_formula = _fuse_formulas(
+                fused_keys, self.formulas, input_list_renamed
             )
+        # lambdify registers each generated function's source in linecache
+        linecache.clearcache()
 
     def _validate_formulas(self, formula: str):
         try:
-            sp.sympify(formula.replace(":", "_"))
+            return _sympify_formula(formula)
         except Exception as e:
             raise Exception(f"Invalid formula: {formula}: {e}")
 
@@ -132,16 +443,9 @@ class InputPVTransformer:
             Dictionary mapping transformed variable names to their computed values and timestamps.
         """
         for pv, value in input_dict.items():
-            # assert value is float
             try:
-                if isinstance(value["value"], (float, int, np.float32)):
-                    value["value"] = float(value["value"])
-                elif isinstance(value["value"], (np.ndarray, list)):
-                    value["value"] = np.array(value["value"]).astype(float)
-                else:
-                    raise Exception(
-                        f"Invalid type for value: {value['value']}, type: {type(value['value'])}"
-                    )
+                if type(value["value"]) is not float:
+                    value["value"] = _as_float(value["value"])
             except Exception as e:
                 logger.error(f"Error converting value to float: {e}")
                 raise e
@@ -153,32 +457,59 @@ class InputPVTransformer:
             raise e
 
     def _transform(self, input_dict):
-        transformed = {}
+        rename = self._rename_map
         pvs_renamed = {
-            key.replace(":", "_"): value["value"] for key, value in input_dict.items()
+            rename.get(key) or key.replace(":", "_"): value["value"]
+            for key, value in input_dict.items()
         }
 
-        for key in self.pv_mapping.keys():
+        fused = {}
+        if self._fused_formula is not None:
             try:
-                lambdified_formula = self.lambdified_formulas[key]
-                transformed[key] = lambdified_formula(
-                    *[
-                        pvs_renamed[symbol.replace(":", "_")]
-                        for symbol in self.input_list
-                    ]
+                fused = dict(
+                    zip(
+                        self._fused_keys,
+                        self._fused_formula(*[pvs_renamed[name] for name in self._fused_args]),
+                    )
                 )
+            except Exception as e:
+                logger.error(f"Error transforming: {e}")
+                raise e
 
-                if isinstance(transformed[key], np.ndarray):
-                    if transformed[key].shape[-1] == 1:
-                        transformed[key] = transformed[key].squeeze()
+        values = []
+        for key in self._keys:
+            try:
+                if key in self._constants:
+                    values.append(self._constants[key])
+                    continue
+                if key in self._passthrough:
+                    value = pvs_renamed[self._passthrough[key]]
+                elif key in self._affine:
+                    a, b, name = self._affine[key]
+                    value = a * pvs_renamed[name] + b
+                elif key in fused:
+                    value = fused[key]
                 else:
-                    transformed[key] = float(transformed[key])
+                    lambdified_formula = self.lambdified_formulas[key]
+                    value = lambdified_formula(
+                        *[pvs_renamed[name] for name in self._arg_names[key]]
+                    )
+
+                if isinstance(value, np.ndarray):
+                    if value.ndim == 0:
+                        # e.g. Piecewise formulas evaluated on scalars
+                        value = float(value)
+                    elif value.shape[-1] == 1:
+                        value = value.squeeze()
+                else:
+                    value = float(value)
+                values.append(value)
 
             except Exception as e:
                 logger.error(f"Error transforming: {e}")
                 raise e
 
-        return transformed
+        return dict(zip(self._keys, values))
 
 
 class OutputPVTransformer:
@@ -223,7 +554,7 @@ class OutputPVTransformer:
         Transforms the output PVs based on the defined formulas.
     """
 
-    def __init__(self, config):
+    def __init__(self, config, numba=False, ufunc_dir=None):
         """
         Initializes the OututPVTransformer with the given configuration.
 
@@ -231,57 +562,107 @@ class OutputPVTransformer:
         ----------
         config : dict
             Configuration dictionary containing input variable mappings and formulas.
+        numba : bool, None or dict, optional
+            Whether to compile formulas with numba, if it is installed. True compiles
+            every formula, False (default) none, and None only formulas calling
+            numpy functions. A dict maps variable names to these values for
+            individual formulas; variables missing from it are not compiled.
+            Compiled formulas return inf/nan instead of raising on division by zero
+            or invalid operations.
+        ufunc_dir : str or path-like, optional
+            If given, compile formulas to C numpy ufuncs with sympy's ``ufuncify``,
+            keeping the compiled modules in this directory for later runs. For
+            array-valued PVs this avoids numpy's temporary arrays, where numba is not
+            available; for scalars it is slower, and division by zero gives inf
+            instead of raising. Formulas resolved without a call are not compiled;
+            formulas that fail to compile use ``numba`` or numpy.
         """
         self.pv_mapping = config["output_variables"]
         # Get all symbols (PVs) used in the formulas
         self.output_list = list(self.pv_mapping.keys())
         self.model_output_list = []
         self.proto_list = []
-        for c in self.pv_mapping:
-            try:
-                for symbol in self.pv_mapping[c]["symbols"]:
-                    if symbol not in self.model_output_list:
-                        self.model_output_list.append(symbol)
-                        try:
-                            self.proto_list.append(self.pv_mapping[c]["proto"])
-                        except KeyError:
-                            logger.error(
-                                f"No proto defined for PV {symbol}, defaulting to 'ca'."
-                            )
-                            self.proto_list.append("ca")
-            except KeyError as e:
+        seen = set()
+        for c, mapping in self.pv_mapping.items():
+            if "symbols" not in mapping:
                 logger.error(
                     f"No symbols defined for for {c}. Symbols are required in the output config."
                 )
-                raise e
+                raise KeyError("symbols")
+            proto = mapping.get("proto", "ca")
+            for symbol in mapping["symbols"]:
+                if symbol not in seen:
+                    seen.add(symbol)
+                    self.model_output_list.append(symbol)
+                    if "proto" not in mapping:
+                        logger.error(
+                            f"No proto defined for PV {symbol}, defaulting to 'ca'."
+                        )
+                    self.proto_list.append(proto)
 
         logger.debug("Initializing Transformer")
-        logger.debug(f"PV Mapping: {self.pv_mapping}")
-        logger.debug(f"Symbol List: {self.model_output_list}")
-        logger.debug(f"Output PV List: {self.output_list}")
+        logger.debug("PV Mapping: %s", self.pv_mapping)
+        logger.debug("Symbol List: %s", self.model_output_list)
+        logger.debug("Output PV List: %s", self.output_list)
 
+        # Result keys, in config order
+        self._keys = tuple(self.pv_mapping)
+        self.formulas = {}
         for key, value in self.pv_mapping.items():
-            try:
-                self._validate_formulas(str(value["formula"]))
-            except KeyError as e:
+            if "formula" not in value:
                 logger.error(
                     f"No formula defined for {key}. A formula is required in the config."
                 )
-                raise e
-        self.formulas = {}
+                raise KeyError("formula")
+            self.formulas[key] = self._validate_formulas(str(value["formula"]))
         self.lambdified_formulas = {}
-        for key, value in self.pv_mapping.items():
-            self.formulas[key] = sp.sympify(str(value["formula"]).replace(":", "_"))
-            output_list_renamed = [
-                symbol.replace(":", "_") for symbol in self.model_output_list
-            ]
-            self.lambdified_formulas[key] = sp.lambdify(
-                output_list_renamed, self.formulas[key], modules="numpy"
+        # Constant, single-symbol and affine formulas are resolved in _transform
+        # without a call
+        self._constants = {}
+        self._passthrough = {}
+        self._affine = {}
+        # Renamed PV names, and the subset each formula is called with
+        self._rename_map = {symbol: symbol.replace(":", "_") for symbol in self.model_output_list}
+        output_list_renamed = list(self._rename_map.values())
+        self._arg_names = {}
+        fused_keys = []
+        for key in self.pv_mapping:
+            shortcut = _formula_shortcut(self.formulas[key])
+            if shortcut is not None:
+                kind, target = shortcut
+                if kind == "constant":
+                    self._constants[key] = target
+                elif kind == "affine":
+                    self._affine[key] = target
+                else:
+                    self._passthrough[key] = target
+                continue
+            arg_names = _formula_args(self.formulas[key], output_list_renamed)
+            self._arg_names[key] = arg_names
+            func = _lambdify_formula(arg_names, self.formulas[key])
+            compiled = None
+            if ufunc_dir is not None:
+                compiled = _ufunc_formula(arg_names, self.formulas[key], ufunc_dir)
+            if compiled is None:
+                compiled = _jit_formula(
+                    func, len(arg_names), self.formulas[key], _numba_setting(numba, key)
+                )
+            self.lambdified_formulas[key] = compiled
+            if self.lambdified_formulas[key] is func:
+                fused_keys.append(key)
+        # Formulas not compiled with numba are evaluated together in one call
+        self._fused_keys = tuple(fused_keys)
+        self._fused_args, self._fused_formula = (), None
+        if fused_keys:
+            self._fused_args, self._fused_formula = _fuse_formulas(
+                fused_keys, self.formulas, output_list_renamed
             )
+        # lambdify registers each generated function's source in linecache
+        linecache.clearcache()
 
     def _validate_formulas(self, formula: str):
         try:
-            sp.sympify(formula.replace(":", "_"))
+            return _sympify_formula(formula)
         except Exception as e:
             raise Exception(f"Invalid formula: {formula}: {e}")
 
@@ -301,16 +682,9 @@ class OutputPVTransformer:
         """
         # TODO: adjust to handle other types as needed
         for pv, value in output_dict.items():
-            # assert value is float
             try:
-                if isinstance(value, (float, int, np.float32)):
-                    output_dict[pv] = float(value)
-                elif isinstance(value, (np.ndarray, list)):
-                    output_dict[pv] = np.array(value).astype(float)
-                else:
-                    raise Exception(
-                        f"Invalid type for value: {value}, type: {type(value)}"
-                    )
+                if type(value) is not float:
+                    output_dict[pv] = _as_float(value)
             except Exception as e:
                 logger.error(f"Error converting value to float: {e}")
                 raise e
@@ -322,31 +696,55 @@ class OutputPVTransformer:
             raise e
 
     def _transform(self, output_dict):
-        transformed = {}
+        rename = self._rename_map
         pvs_renamed = {
-            key.replace(":", "_"): value for key, value in output_dict.items()
+            rename.get(key) or key.replace(":", "_"): value
+            for key, value in output_dict.items()
         }
 
-        for key in self.pv_mapping.keys():
+        fused = {}
+        if self._fused_formula is not None:
             try:
-                lambdified_formula = self.lambdified_formulas[key]
-                transformed[key] = lambdified_formula(
-                    *[
-                        pvs_renamed[symbol.replace(":", "_")]
-                        for symbol in self.model_output_list
-                    ]
+                fused = dict(
+                    zip(
+                        self._fused_keys,
+                        self._fused_formula(*[pvs_renamed[name] for name in self._fused_args]),
+                    )
                 )
+            except Exception as e:
+                logger.error(f"Error transforming: {e}")
+                raise e
+
+        values = []
+        for key in self._keys:
+            try:
+                if key in self._constants:
+                    values.append(self._constants[key])
+                    continue
+                if key in self._passthrough:
+                    value = pvs_renamed[self._passthrough[key]]
+                elif key in self._affine:
+                    a, b, name = self._affine[key]
+                    value = a * pvs_renamed[name] + b
+                elif key in fused:
+                    value = fused[key]
+                else:
+                    lambdified_formula = self.lambdified_formulas[key]
+                    value = lambdified_formula(
+                        *[pvs_renamed[name] for name in self._arg_names[key]]
+                    )
 
-                if isinstance(transformed[key], np.ndarray):
-                    if len(transformed[key].shape) <= 1:
-                        transformed[key] = float(transformed[key].squeeze())
-                    elif transformed[key].shape[-1] == 1:
-                        transformed[key] = transformed[key].squeeze()
+                if isinstance(value, np.ndarray):
+                    if len(value.shape) <= 1:
+                        value = float(value.squeeze())
+                    elif value.shape[-1] == 1:
+                        value = value.squeeze()
                 else:
-                    transformed[key] = float(transformed[key])
+                    value = float(value)
+                values.append(value)
 
             except Exception as e:
                 logger.error(f"Error transforming: {e}")
                 raise e
 
-        return transformed
+        return dict(zip(self._keys, values))
@@ -0,0 +1,13 @@
+import importlib.util
+import sys
+import types
+
+# template_config.py is rendered by copier when the template is instantiated; in the
+# template repository itself, provide the same names with test values
+if importlib.util.find_spec("online_model.configs.template_config") is None:
+    template_config = types.ModuleType("online_model.configs.template_config")
+    template_config.registered_model_name = "test-model"
+    template_config.mlflow_tracking_uri = "file:///tmp/mlruns"
+    template_config.deployment_name = "test-deployment"
+    template_config.rate = 1
+    sys.modules[template_config.__name__] = template_config
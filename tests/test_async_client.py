@@ -0,0 +1,113 @@
+import asyncio
+import time
+
+import pytest
+from aiohttp import web
+
+from online_model.async_client import AsyncInferenceClient
+
+
+async def _serve(handler):
+    app = web.Application()
+    app.router.add_post("/predict/batch", handler)
+    # Do not wait for handlers still sleeping when the test ends
+    runner = web.AppRunner(app, shutdown_timeout=0.1)
+    await runner.setup()
+    site = web.TCPSite(runner, "127.0.0.1", 0)
+    await site.start()
+    port = site._server.sockets[0].getsockname()[1]
+    return runner, f"http://127.0.0.1:{port}"
+
+
+def _doubling_handler(stats, latency=0.0, drop_last=False):
+    async def handler(request):
+        body = await request.json()
+        stats["requests"] += 1
+        stats["in_flight"] += 1
+        stats["max_in_flight"] = max(stats["max_in_flight"], stats["in_flight"])
+        try:
+            await asyncio.sleep(latency)
+        finally:
+            stats["in_flight"] -= 1
+        outputs_list = [{"y": 2 * inputs["x"]} for inputs in body["inputs_list"]]
+        if drop_last:
+            outputs_list = outputs_list[:-1]
+        return web.json_response({"outputs_list": outputs_list})
+
+    return handler
+
+
+def _stats():
+    return {"requests": 0, "in_flight": 0, "max_in_flight": 0}
+
+
+def test_predict_async_batches_and_resolves_each_caller():
+    stats = _stats()
+
+    async def main():
+        runner, url = await _serve(_doubling_handler(stats))
+        try:
+            async with AsyncInferenceClient(url, max_batch_size=8, max_wait_ms=20) as client:
+                return await asyncio.gather(*[client.predict_async({"x": i}) for i in range(16)])
+        finally:
+            await runner.cleanup()
+
+    results = asyncio.run(main())
+    assert results == [{"outputs": {"y": 2 * i}} for i in range(16)]
+    assert stats["requests"] == 2
+
+
+def test_batches_are_sent_concurrently():
+    stats = _stats()
+
+    async def main():
+        runner, url = await _serve(_doubling_handler(stats, latency=0.05))
+        try:
+            async with AsyncInferenceClient(url, max_batch_size=4, pool_maxsize=3) as client:
+                await asyncio.gather(*[client.predict_async({"x": i}) for i in range(40)])
+        finally:
+            await runner.cleanup()
+
+    asyncio.run(main())
+    assert stats["requests"] == 10
+    assert stats["max_in_flight"] == 3
+
+
+def test_short_batch_reply_fails_every_caller():
+    stats = _stats()
+
+    async def main():
+        runner, url = await _serve(_doubling_handler(stats, drop_last=True))
+        try:
+            async with AsyncInferenceClient(url, max_batch_size=4, max_wait_ms=20) as client:
+                tasks = [client.predict_async({"x": i}) for i in range(4)]
+                return await asyncio.wait_for(asyncio.gather(*tasks, return_exceptions=True), 5)
+        finally:
+            await runner.cleanup()
+
+    results = asyncio.run(main())
+    assert all(isinstance(result, ValueError) for result in results)
+
+
+@pytest.mark.parametrize("delay", [0, 0.01, 0.2])
+def test_close_fails_pending_predictions(delay):
+    stats = _stats()
+
+    async def main():
+        runner, url = await _serve(_doubling_handler(stats, latency=10))
+        try:
+            client = AsyncInferenceClient(url, max_batch_size=2, max_wait_ms=50)
+            tasks = [asyncio.create_task(client.predict_async({"x": i})) for i in range(5)]
+            await asyncio.sleep(delay)
+            start = time.monotonic()
+            await asyncio.wait_for(client.close(), 5)
+            elapsed = time.monotonic() - start
+            results = await asyncio.wait_for(asyncio.gather(*tasks, return_exceptions=True), 5)
+            return elapsed, results
+        finally:
+            await runner.cleanup()
+
+    elapsed, results = asyncio.run(main())
+    assert elapsed < 1
+    assert [str(result) for result in results] == ["client closed"] * 5
+    assert all(isinstance(result, ConnectionError) for result in results)
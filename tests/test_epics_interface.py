@@ -0,0 +1,67 @@
+import logging
+import threading
+import time
+
+import pytest
+
+from online_model.interface import epics_interface
+from online_model.interface.epics_interface import EPICSInterface
+
+
+class FakePV:
+    """PV whose put completes after ``delay`` seconds, or never if ``delay`` is None."""
+
+    def __init__(self, pvname, delay):
+        self.pvname = pvname
+        self.delay = delay
+        self.value = None
+
+    def put(self, value, wait=False, use_complete=False, callback=None):
+        self.value = value
+        if callback is None or self.delay is None:
+            return
+        if self.delay == 0:
+            # pyepics polls right after issuing a put, so a fast IOC can complete
+            # it before the caller issues the next one
+            callback(pvname=self.pvname)
+        else:
+            threading.Timer(self.delay, callback, kwargs={"pvname": self.pvname}).start()
+
+
+@pytest.fixture
+def interface(monkeypatch):
+    monkeypatch.setenv("EPICS_CA_ADDR_LIST", "127.0.0.1")
+    monkeypatch.setenv("EPICS_CA_AUTO_ADDR_LIST", "NO")
+    monkeypatch.setattr(epics_interface.epics.ca, "flush_io", lambda: None)
+    interface = EPICSInterface()
+    interface.pv_objects = {}
+    monkeypatch.setattr(interface, "_get_pv", lambda name: interface.pv_objects[name])
+    monkeypatch.setattr(interface, "_ensure_connected", lambda pv: True)
+    return interface
+
+
+def test_put_waits_for_later_puts_after_early_completion(interface, caplog):
+    interface.pv_objects = {"A": FakePV("A", 0), "B": FakePV("B", 0.2)}
+    start = time.monotonic()
+    with caplog.at_level(logging.ERROR):
+        interface.put_output_variables({"A": 1.0, "B": 2.0}, confirm_timeout=2.0)
+    assert 0.15 < time.monotonic() - start < 1.5
+    assert "not confirmed" not in caplog.text
+
+
+def test_put_logs_unconfirmed_pvs(interface, caplog):
+    interface.pv_objects = {"A": FakePV("A", 0), "B": FakePV("B", None)}
+    start = time.monotonic()
+    with caplog.at_level(logging.ERROR):
+        interface.put_output_variables({"A": 1.0, "B": 2.0}, confirm_timeout=0.2)
+    assert time.monotonic() - start >= 0.2
+    assert "Put to PV B not confirmed" in caplog.text
+    assert "Put to PV A" not in caplog.text
+
+
+def test_put_without_confirmation_does_not_wait(interface):
+    interface.pv_objects = {"A": FakePV("A", None)}
+    start = time.monotonic()
+    interface.put_output_variables({"A": 1.0})
+    assert time.monotonic() - start < 0.1
+    assert interface.pv_objects["A"].value == 1.0
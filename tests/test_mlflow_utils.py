@@ -0,0 +1,80 @@
+import threading
+
+from online_model.mlflow_utils import MetricLogWorker
+
+
+class FakeMlflowClient:
+    """Records log_batch calls; each call waits for ``release`` if it is given."""
+
+    def __init__(self, release=None, fail=False):
+        self.batches = []
+        self.release = release
+        self.fail = fail
+        self.called = threading.Event()
+
+    def log_batch(self, run_id, metrics):
+        self.called.set()
+        if self.release is not None:
+            self.release.wait()
+        if self.fail:
+            raise ConnectionError("tracking server unreachable")
+        self.batches.append((run_id, metrics))
+
+    def logged(self):
+        return [
+            (metric.key, metric.value, metric.step)
+            for _, metrics in self.batches
+            for metric in metrics
+        ]
+
+
+def test_queued_steps_are_sent_in_batches():
+    release = threading.Event()
+    client = FakeMlflowClient(release)
+    worker = MetricLogWorker("run", max_batch_steps=2, client=client)
+    for step in range(5):
+        worker.log_metrics({"x": step}, timestamp=step)
+    release.set()
+    worker.close(timeout=5)
+    assert not worker.is_alive()
+    assert all(run_id == "run" for run_id, _ in client.batches)
+    assert sorted(client.logged()) == [("x", float(step), step) for step in range(5)]
+    # The first step may be sent alone while the rest queue up behind it
+    assert len(client.batches) <= 4
+
+
+def test_full_queue_drops_the_oldest_step():
+    release = threading.Event()
+    client = FakeMlflowClient(release)
+    worker = MetricLogWorker("run", max_batch_steps=1, maxsize=2, client=client)
+    worker.log_metrics({"x": 0}, timestamp=0)
+    # Wait for the worker to be sending the first step, so the queue holds only later ones
+    assert client.called.wait(5)
+    for step in range(1, 5):
+        worker.log_metrics({"x": step}, timestamp=step)
+    release.set()
+    worker.close(timeout=5)
+    assert [step for _, _, step in client.logged()] == [0, 3, 4]
+
+
+def test_bad_values_and_failed_requests_do_not_stop_the_worker():
+    client = FakeMlflowClient(fail=True)
+    worker = MetricLogWorker("run", client=client)
+    worker.log_metrics({"x": [1.0, 2.0], "y": None}, timestamp=0)
+    worker.log_metrics({"x": 1.0}, timestamp=1)
+    worker.close(timeout=5)
+    assert not worker.is_alive()
+
+
+def test_close_returns_after_timeout_when_the_server_hangs():
+    release = threading.Event()
+    client = FakeMlflowClient(release)
+    worker = MetricLogWorker("run", maxsize=1, client=client)
+    worker.log_metrics({"x": 0}, timestamp=0)
+    assert client.called.wait(5)
+    worker.log_metrics({"x": 1}, timestamp=1)
+    worker.close(timeout=0.1)
+    assert worker.is_alive()
+    release.set()
+    worker.join(5)
+    assert not worker.is_alive()
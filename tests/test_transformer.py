@@ -0,0 +1,70 @@
+import pytest
+import sympy as sp
+
+from online_model.transformers.transformer import (
+    InputPVTransformer,
+    OutputPVTransformer,
+    _formula_shortcut,
+)
+
+CONDITIONAL_FORMULAS = [
+    # formula, value of X:A, expected result
+    ("X:A > 1", 2.0, 1.0),
+    ("X:A > 1", 0.5, 0.0),
+    ("Piecewise((X:A, X:A > 0), (0, True))", 2.0, 2.0),
+    ("Piecewise((X:A, X:A > 0), (0, True))", -0.5, 0.0),
+]
+
+
+@pytest.mark.parametrize("formula", ["a > 1", "Piecewise((a, a > 0), (0, True))"])
+def test_formula_shortcut_skips_conditional_formulas(formula):
+    assert _formula_shortcut(sp.sympify(formula)) is None
+
+
+def test_formula_shortcut_affine():
+    assert _formula_shortcut(sp.sympify("3*a - 1")) == ("affine", (3.0, -1.0, "a"))
+
+
+@pytest.mark.parametrize("formula, value, expected", CONDITIONAL_FORMULAS)
+def test_input_transformer_conditional_formulas(formula, value, expected):
+    config = {
+        "input_variables": {
+            "x": {"formula": formula, "symbols": ["X:A"], "proto": "ca"}
+        }
+    }
+    transformer = InputPVTransformer(config)
+    assert transformer.transform({"X:A": {"value": value}}) == {"x": expected}
+
+
+@pytest.mark.parametrize("formula, value, expected", CONDITIONAL_FORMULAS)
+def test_output_transformer_conditional_formulas(formula, value, expected):
+    config = {
+        "output_variables": {
+            "OUT:X": {"formula": formula, "symbols": ["X:A"], "proto": "ca"}
+        }
+    }
+    transformer = OutputPVTransformer(config)
+    assert transformer.transform({"X:A": value}) == {"OUT:X": expected}
+
+
+
+def _single_formula_transformer(formula):
+    config = {
+        "input_variables": {
+            "x": {"formula": formula, "symbols": ["X:A", "X:B"], "proto": "ca"}
+        }
+    }
+    return InputPVTransformer(config)
+
+
+def test_input_transformer_division_by_zero_matches_lambdify():
+    # Formulas are not compiled with numba by default, so numpy scalars divide to
+    # inf while plain Python floats raise
+    transformer = _single_formula_transformer("sin(X:B)/X:A")
+    with pytest.warns(RuntimeWarning):
+        result = transformer.transform({"X:A": {"value": 0.0}, "X:B": {"value": 1.0}})
+    assert result == {"x": float("inf")}
+
+    transformer = _single_formula_transformer("X:B/X:A")
+    with pytest.raises(ZeroDivisionError):
+        transformer.transform({"X:A": {"value": 0.0}, "X:B": {"value": 1.0}})